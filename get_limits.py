@@ -4,12 +4,37 @@
 """
 
 import os
+import re
 import sys
 import json
 import sqlite3
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterable, Iterator, Tuple, Union
 from colorama import Fore, Style, init
 
+# orjson разбирает JSON заметно быстрее стандартного json; если не установлен - используем json
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    json_loads = json.loads
+
+# ijson - запасной вариант без orjson: потоковый разбор storage.json без загрузки всего документа
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# orjson.JSONDecodeError и json.JSONDecodeError - подклассы ValueError
+JSONDecodeError = ValueError
+
+# Ошибки разбора storage.json (у ijson собственная иерархия исключений)
+STORAGE_JSON_ERRORS = (ValueError, ijson.JSONError) if ijson is not None else (ValueError,)
+
 # Инициализация colorama
 init()
 
@@ -23,81 +48,212 @@ EMOJI = {
     "USAGE": "📈",
 }
 
+# Готовые цветные строки, чтобы не собирать их заново при каждом выводе
+_RESET = Style.RESET_ALL
+_GREEN = Fore.GREEN
+_WHITE = Fore.WHITE
+_BAR_EQ = f"{Fore.CYAN}{'='*70}{_RESET}"
+_BAR_DASH = f"{Fore.MAGENTA}{'─'*70}{_RESET}"
+
+# Ключевые слова для поиска лимитов (более специфичные)
+LIMIT_KW = frozenset({
+    'limit', 'usage', 'quota', 'subscription', 'requests',
+    'tokens', 'remaining', 'used', 'total', 'free',
+    'premium', 'pro', 'tier', 'plan', 'credits', 'balance',
+    'grace', 'period', 'hours', 'minutes', 'count',
+})
+
+# Исключаем ключи, которые точно не связаны с лимитами
+EXCLUDE_KW = frozenset({
+    'profile', 'workspace', 'recommendation', 'association',
+    'settings', 'configuration', 'preference', 'history',
+})
+
+# В ItemTable ключей намного больше, поэтому фильтр для SQLite строже
+SQLITE_LIMIT_KW = LIMIT_KW - {'count'}
+SQLITE_EXCLUDE_KW = EXCLUDE_KW | {'extension', 'github', 'git'}
+
+def _keyword_re(keywords) -> re.Pattern:
+    """Собрать регулярное выражение "любое из слов" для поиска подстроки"""
+    return re.compile("|".join(sorted(map(re.escape, keywords))))
+
+# Ключи бывают в camelCase (newPrivacyModeHoursRemaining...), поэтому ищем подстроки,
+# а не целые слова - одним проходом регулярного выражения вместо any(...) по списку
+_LIMIT_RE = _keyword_re(LIMIT_KW)
+_EXCLUDE_RE = _keyword_re(EXCLUDE_KW)
+
+def _ordered_search_re(groups) -> re.Pattern:
+    """Собрать регулярное выражение "первая группа, слово которой есть в строке".
+
+    Каждая ветка - просмотр вперед по всей строке, ветки проверяются по порядку,
+    поэтому match() находит первую подходящую группу (а не самое левое слово),
+    а имя группы доступно через match.lastgroup.
+    """
+    branches = (
+        f"(?=.*?(?:{'|'.join(map(re.escape, words))}))(?P<{name}>)"
+        for name, words in groups
+    )
+    return re.compile(f"(?:{'|'.join(branches)})", re.DOTALL)
+
+# Категории лимитов и слова, по которым ключ относится к категории (в порядке приоритета)
+CATEGORY_MAP = (
+    ("Подписка", frozenset({'subscription', 'tier', 'plan', 'premium', 'pro'})),
+    ("Оставшееся время", frozenset({'remaining', 'hours', 'minutes', 'grace', 'period'})),
+    ("Использование", frozenset({'usage', 'used', 'count'})),
+    ("Лимиты", frozenset({'limit', 'quota', 'total', 'max'})),
+    ("Ресурсы", frozenset({'tokens', 'requests', 'credits', 'balance'})),
+)
+OTHER_CATEGORY = "Прочее"
+CATEGORY_ORDER = tuple(name for name, _ in CATEGORY_MAP) + (OTHER_CATEGORY,)
+
+_CATEGORY_NAMES = {f"c{i}": name for i, (name, _) in enumerate(CATEGORY_MAP)}
+_CATEGORY_RE = _ordered_search_re(
+    (f"c{i}", sorted(words)) for i, (_, words) in enumerate(CATEGORY_MAP)
+)
+
+# Маппинг ключей на понятные названия
+DISPLAY_NAMES = {
+    'remaining': 'Осталось',
+    'used': 'Использовано',
+    'total': 'Всего',
+    'limit': 'Лимит',
+    'quota': 'Квота',
+    'subscription': 'Подписка',
+    'tier': 'Тариф',
+    'plan': 'План',
+    'tokens': 'Токены',
+    'requests': 'Запросы',
+    'credits': 'Кредиты',
+    'balance': 'Баланс',
+    'hours': 'Часы',
+    'minutes': 'Минуты',
+    'grace': 'Льготный период',
+    'period': 'Период',
+    'premium': 'Премиум',
+    'pro': 'Про',
+    'free': 'Бесплатно',
+    'newprivacymodehoursremainingingraceperiod': 'Льготный период (часы)',
+}
+
+# Максимальная глубина вложенности словарей при поиске лимитов
+MAX_SEARCH_DEPTH = 5
+
+# Размер пачки строк при чтении ItemTable
+SQLITE_FETCH_SIZE = 256
+
+# Специфичные ключи Cursor, которые берутся из storage.json целиком
+CURSOR_SPECIFIC_KEYS = frozenset({
+    'cursor.usage',
+    'cursor.limits',
+    'cursor.subscription',
+    'cursor.quota',
+    'cursor.requests',
+    'cursor.tokens',
+    'cursor.credits',
+    'cursor.balance',
+})
+
+# SQL-запросы собираются один раз: одинаковый текст запроса позволяет sqlite3
+# переиспользовать подготовленные выражения из своего кэша соединения
+SQL_SELECT_TABLES = "SELECT name FROM sqlite_master WHERE type='table'"
+
+# LIKE в SQLite не учитывает регистр для ASCII
+SQL_SELECT_LIMIT_ITEMS = (
+    "SELECT key, value FROM ItemTable"
+    f" WHERE ({' OR '.join(['key LIKE ?'] * len(SQLITE_LIMIT_KW))})"
+    f" AND NOT ({' OR '.join(['key LIKE ?'] * len(SQLITE_EXCLUDE_KW))})"
+)
+SQL_SELECT_LIMIT_ITEMS_PARAMS = tuple(
+    [f"%{kw}%" for kw in sorted(SQLITE_LIMIT_KW)] + [f"%{kw}%" for kw in sorted(SQLITE_EXCLUDE_KW)]
+)
+
 def is_arch_linux() -> bool:
     """Проверить, является ли система Arch Linux"""
     if sys.platform != "linux":
         return False
     return os.path.exists("/etc/arch-release")
 
-def get_cursor_storage_path() -> str:
-    """Получить путь к файлу storage.json Cursor"""
+@lru_cache(maxsize=1)
+def _cursor_global_storage_dir() -> str:
+    """Получить путь к папке globalStorage Cursor (вычисляется один раз)"""
     if sys.platform == "win32":
         appdata = os.getenv("APPDATA")
         if appdata:
-            return os.path.join(appdata, "Cursor", "User", "globalStorage", "storage.json")
+            return os.path.join(appdata, "Cursor", "User", "globalStorage")
         else:
-            return os.path.join(os.path.expanduser("~"), "AppData", "Roaming", "Cursor", "User", "globalStorage", "storage.json")
+            return os.path.join(os.path.expanduser("~"), "AppData", "Roaming", "Cursor", "User", "globalStorage")
     elif sys.platform == "darwin":
-        return os.path.join(os.path.expanduser("~"), "Library", "Application Support", "Cursor", "User", "globalStorage", "storage.json")
+        return os.path.join(os.path.expanduser("~"), "Library", "Application Support", "Cursor", "User", "globalStorage")
     else:
-        return os.path.join(os.path.expanduser("~"), ".config", "Cursor", "User", "globalStorage", "storage.json")
+        return os.path.join(os.path.expanduser("~"), ".config", "Cursor", "User", "globalStorage")
+
+def get_cursor_storage_path() -> str:
+    """Получить путь к файлу storage.json Cursor"""
+    return os.path.join(_cursor_global_storage_dir(), "storage.json")
 
 def get_cursor_sqlite_path() -> str:
     """Получить путь к SQLite базе данных Cursor"""
-    if sys.platform == "win32":
-        appdata = os.getenv("APPDATA")
-        if appdata:
-            return os.path.join(appdata, "Cursor", "User", "globalStorage", "state.vscdb")
-        else:
-            return os.path.join(os.path.expanduser("~"), "AppData", "Roaming", "Cursor", "User", "globalStorage", "state.vscdb")
-    elif sys.platform == "darwin":
-        return os.path.join(os.path.expanduser("~"), "Library", "Application Support", "Cursor", "User", "globalStorage", "state.vscdb")
-    else:
-        return os.path.join(os.path.expanduser("~"), ".config", "Cursor", "User", "globalStorage", "state.vscdb")
+    return os.path.join(_cursor_global_storage_dir(), "state.vscdb")
 
-def search_limits_in_dict(data: Dict[str, Any], prefix: str = "", results: Optional[Dict] = None) -> Dict[str, Any]:
-    """Рекурсивный поиск информации о лимитах в словаре"""
+def search_limits_in_items(items: Iterable[Tuple[str, Any]], prefix: str = "",
+                           results: Optional[Dict] = None) -> Dict[str, Any]:
+    """Поиск информации о лимитах в парах (ключ, значение) (обход через явный стек)"""
     if results is None:
         results = {}
     
-    # Ключевые слова для поиска лимитов (более специфичные)
-    limit_keywords = [
-        'limit', 'usage', 'quota', 'subscription', 'requests', 
-        'tokens', 'remaining', 'used', 'total', 'free',
-        'premium', 'pro', 'tier', 'plan', 'credits', 'balance',
-        'grace', 'period', 'hours', 'minutes', 'count'
-    ]
+    # Каждую пару верхнего уровня обходим до конца, прежде чем брать следующую:
+    # при потоковом разборе (ijson) её значение освобождается сразу, а не в конце обхода
+    for pair in items:
+        # Вместо рекурсии храним (пары ключ-значение, путь, глубина) - без лишних вызовов функций
+        stack = [((pair,), prefix, 0)]
+        while stack:
+            current, current_prefix, depth = stack.pop()
+            
+            for key, value in current:
+                key_lower = key.lower()
+                
+                # Пропускаем ключи, которые точно не связаны с лимитами
+                if _EXCLUDE_RE.search(key_lower):
+                    continue
+                
+                # Проверяем, содержит ли ключ слова, связанные с лимитами
+                if _LIMIT_RE.search(key_lower):
+                    # Пропускаем пустые значения и очень длинные строки
+                    if value is not None and (not isinstance(value, str) or len(value) < 1000):
+                        results[f"{current_prefix}.{key}" if current_prefix else key] = value
+                
+                # Ищем во вложенных словарях (но не слишком глубоко)
+                if isinstance(value, dict):
+                    if depth < MAX_SEARCH_DEPTH:
+                        stack.append((value.items(), f"{current_prefix}.{key}" if current_prefix else key, depth + 1))
+                elif isinstance(value, list) and len(value) < 10:
+                    # Проверяем элементы списка
+                    for i, item in enumerate(value):
+                        if isinstance(item, dict):
+                            item_prefix = f"{current_prefix}.{key}[{i}]" if current_prefix else f"{key}[{i}]"
+                            stack.append((item.items(), item_prefix, depth + 1))
     
-    # Исключаем ключи, которые точно не связаны с лимитами
-    exclude_keywords = [
-        'profile', 'workspace', 'recommendation', 'association',
-        'settings', 'configuration', 'preference', 'history'
-    ]
+    return results
+
+def _iter_json_items(source) -> Iterator[Tuple[str, Any]]:
+    """Перебрать пары (ключ, значение) верхнего уровня JSON из открытого файла"""
+    # orjson целиком быстрее потокового ijson (даже с C-бэкендом) - ijson только без orjson
+    if orjson is None and ijson is not None:
+        yield from ijson.kvitems(source, "", use_float=True)
+        return
     
-    for key, value in data.items():
-        key_lower = key.lower()
-        
-        # Пропускаем ключи, которые точно не связаны с лимитами
-        if any(exclude in key_lower for exclude in exclude_keywords):
-            continue
-        
-        # Проверяем, содержит ли ключ слова, связанные с лимитами
-        if any(keyword in key_lower for keyword in limit_keywords):
-            full_key = f"{prefix}.{key}" if prefix else key
-            # Пропускаем пустые значения и очень длинные строки
-            if value is not None and (not isinstance(value, str) or len(value) < 1000):
-                results[full_key] = value
-        
-        # Рекурсивно ищем во вложенных словарях (но не слишком глубоко)
-        if isinstance(value, dict) and len(prefix.split('.')) < 5:
-            search_limits_in_dict(value, f"{prefix}.{key}" if prefix else key, results)
-        elif isinstance(value, list) and len(value) < 10:
-            # Проверяем элементы списка
-            for i, item in enumerate(value):
-                if isinstance(item, dict):
-                    search_limits_in_dict(item, f"{prefix}.{key}[{i}]" if prefix else f"{key}[{i}]", results)
+    data = json_loads(source.read())
     
-    return results
+    # Если storage.json - не объект, искать в нем нечего
+    if isinstance(data, dict):
+        yield from data.items()
+
+def iter_storage_items(storage_path: str) -> Iterator[Tuple[str, Any]]:
+    """Перебрать пары (ключ, значение) верхнего уровня storage.json"""
+    # Без mmap: запущенный Cursor может перезаписать storage.json на месте, и обращение
+    # к странице за новым концом файла убило бы процесс по SIGBUS
+    with open(storage_path, "rb") as f:
+        yield from _iter_json_items(f)
 
 def get_limits_from_storage(storage_path: str) -> Dict[str, Any]:
     """Получить лимиты из storage.json"""
@@ -108,29 +264,22 @@ def get_limits_from_storage(storage_path: str) -> Dict[str, Any]:
         return limits
     
     try:
-        with open(storage_path, "r", encoding="utf-8") as f:
-            storage_data = json.load(f)
+        specific = {}
         
-        # Ищем информацию о лимитах
-        limits = search_limits_in_dict(storage_data)
+        def iter_items() -> Iterator[Tuple[str, Any]]:
+            # Попутно запоминаем специфичные ключи Cursor
+            for key, value in iter_storage_items(storage_path):
+                if key in CURSOR_SPECIFIC_KEYS:
+                    specific[key] = value
+                yield key, value
         
-        # Также ищем специфичные ключи Cursor
-        cursor_specific_keys = [
-            'cursor.usage',
-            'cursor.limits',
-            'cursor.subscription',
-            'cursor.quota',
-            'cursor.requests',
-            'cursor.tokens',
-            'cursor.credits',
-            'cursor.balance',
-        ]
+        # Ищем информацию о лимитах
+        limits = search_limits_in_items(iter_items())
         
-        for key in cursor_specific_keys:
-            if key in storage_data:
-                limits[key] = storage_data[key]
+        # Специфичные ключи Cursor имеют приоритет
+        limits.update(specific)
         
-    except json.JSONDecodeError as e:
+    except STORAGE_JSON_ERRORS as e:
         print(f"{Fore.RED}{EMOJI['ERROR']} Ошибка при чтении JSON: {e}{Style.RESET_ALL}")
     except Exception as e:
         print(f"{Fore.RED}{EMOJI['ERROR']} Ошибка при чтении storage.json: {e}{Style.RESET_ALL}")
@@ -146,45 +295,32 @@ def get_limits_from_sqlite(sqlite_path: str) -> Dict[str, Any]:
         return limits
     
     try:
-        conn = sqlite3.connect(sqlite_path)
+        # Только читаем, поэтому открываем базу в режиме read-only
+        conn = sqlite3.connect(f"{Path(os.path.abspath(sqlite_path)).as_uri()}?mode=ro", uri=True)
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute("PRAGMA temp_store=MEMORY")
         cursor = conn.cursor()
         
         # Получаем все таблицы
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+        cursor.execute(SQL_SELECT_TABLES)
         tables = cursor.fetchall()
         
         # Ищем информацию о лимитах в таблице ItemTable (стандартная таблица VS Code/Cursor)
         try:
-            cursor.execute("SELECT key, value FROM ItemTable")
-            rows = cursor.fetchall()
+            # Фильтруем ключи на стороне SQLite, чтобы не тянуть в Python все строки таблицы
+            # (точные ключи CURSOR_SPECIFIC_KEYS тоже попадают под SQLITE_LIMIT_KW)
+            cursor.execute(SQL_SELECT_LIMIT_ITEMS, SQL_SELECT_LIMIT_ITEMS_PARAMS)
             
-            limit_keywords = [
-                'limit', 'usage', 'quota', 'subscription', 'requests', 
-                'tokens', 'remaining', 'used', 'total', 'free',
-                'premium', 'pro', 'tier', 'plan', 'credits', 'balance',
-                'grace', 'period', 'hours', 'minutes'
-            ]
-            
-            # Исключаем ключи, которые точно не связаны с лимитами
-            exclude_keywords = [
-                'profile', 'workspace', 'recommendation', 'association',
-                'settings', 'configuration', 'preference', 'history',
-                'extension', 'github', 'git'
-            ]
-            
-            for key, value in rows:
-                key_lower = key.lower()
-                
-                # Пропускаем исключенные ключи
-                if any(exclude in key_lower for exclude in exclude_keywords):
-                    continue
-                
-                if any(keyword in key_lower for keyword in limit_keywords):
+            # Читаем строки пачками по arraysize, не создавая список всех строк сразу
+            cursor.arraysize = SQLITE_FETCH_SIZE
+            for batch in iter(cursor.fetchmany, []):
+                for key, value in batch:
                     # Пытаемся распарсить JSON значение
                     try:
-                        parsed_value = json.loads(value)
+                        parsed_value = json_loads(value.encode() if isinstance(value, str) else value)
                         limits[key] = parsed_value
-                    except (json.JSONDecodeError, TypeError):
+                    except (JSONDecodeError, TypeError):
                         # Если не JSON, сохраняем как есть (если не слишком длинное)
                         if not isinstance(value, str) or len(value) < 500:
                             limits[key] = value
@@ -212,124 +348,144 @@ def get_limits_from_sqlite(sqlite_path: str) -> Dict[str, Any]:
     
     return limits
 
+@dataclass(frozen=True, slots=True)
+class ParsedKey:
+    """Разобранный ключ лимита: все производные строки считаются один раз"""
+    original: str
+    lower: str
+    parts: Tuple[str, ...]   # сегменты пути без префиксов источников storage./sqlite.
+    last: str                # последний сегмент пути
+    bucket: Optional[str]    # родительский сегмент исходного ключа ("quota/total" -> "quota")
+
+@lru_cache(maxsize=1024)
+def parse_key(key: str) -> ParsedKey:
+    """Разобрать ключ лимита"""
+    # Убираем префиксы источников
+    parts = tuple(key.replace('storage.', '').replace('sqlite.', '').split('/'))
+    bucket = key.rsplit('/', 2)[-2] if '/' in key else None
+    return ParsedKey(key, key.lower(), parts, parts[-1], bucket)
+
+@lru_cache(maxsize=1024)
 def get_category(key: str) -> str:
     """Определить категорию лимита по ключу"""
-    key_lower = key.lower()
-    
-    if any(word in key_lower for word in ['subscription', 'tier', 'plan', 'premium', 'pro']):
-        return "Подписка"
-    elif any(word in key_lower for word in ['remaining', 'hours', 'minutes', 'grace', 'period']):
-        return "Оставшееся время"
-    elif any(word in key_lower for word in ['usage', 'used', 'count']):
-        return "Использование"
-    elif any(word in key_lower for word in ['limit', 'quota', 'total', 'max']):
-        return "Лимиты"
-    elif any(word in key_lower for word in ['tokens', 'requests', 'credits', 'balance']):
-        return "Ресурсы"
+    match = _CATEGORY_RE.match(parse_key(key).lower)
+    return _CATEGORY_NAMES[match.lastgroup] if match else OTHER_CATEGORY
+
+# Флаги форматирования числа по ключу
+_FMT_MINUTES = 1
+_FMT_HOURS = 2
+
+@lru_cache(maxsize=1024)
+def _fmt_flags(key: str) -> int:
+    """Определить по ключу, как форматировать число (минуты/часы)"""
+    key_lower = parse_key(key).lower
+    flags = 0
+    if 'minutes' in key_lower:
+        flags |= _FMT_MINUTES
+    if 'hours' in key_lower or 'remaining' in key_lower:
+        flags |= _FMT_HOURS
+    return flags
+
+def _group_digits(value: float) -> str:
+    """Округлить число и разделить разряды пробелами (1234567 -> 1 234 567)"""
+    # str.replace для одного символа быстрее, чем str.translate
+    return f"{value:,.0f}".replace(",", " ")
+
+def _fmt_dict(value: dict, key: str) -> str:
+    """Для словарей показываем компактный формат"""
+    items = []
+    for k, v in value.items():
+        if isinstance(v, (int, float, str, bool)):
+            items.append(f"{k}: {v}")
+        else:
+            items.append(f"{k}: ...")
+    result = ", ".join(items[:3])
+    if len(items) > 3:
+        result += f" ... (+{len(items) - 3} еще)"
+    return result
+
+def _fmt_list(value: list, key: str) -> str:
+    """Форматирование списка"""
+    if len(value) == 0:
+        return "пусто"
+    elif len(value) <= 3:
+        return ", ".join(str(v) for v in value)
     else:
-        return "Прочее"
+        return f"{len(value)} элементов: {', '.join(str(v) for v in value[:2])} ..."
+
+def _fmt_num(value: float, key: str) -> str:
+    """Для числовых значений добавляем форматирование"""
+    flags = _fmt_flags(key)
+    
+    # Форматирование времени
+    if flags and value >= 0:
+        if flags & _FMT_MINUTES and value >= 60:
+            hours = int(value // 60)
+            minutes = int(value % 60)
+            if hours > 0 and minutes > 0:
+                return f"{hours} ч. {minutes} мин."
+            elif hours > 0:
+                return f"{hours} ч."
+            else:
+                return f"{int(value)} мин."
+        elif flags & _FMT_HOURS:
+            hours = int(value)
+            if hours >= 24:
+                days = hours // 24
+                remaining_hours = hours % 24
+                if days > 0 and remaining_hours > 0:
+                    return f"{days} дн. {remaining_hours} ч."
+                elif days > 0:
+                    return f"{days} дн."
+            return f"{hours} ч."
+    
+    # Форматирование чисел
+    if value >= 1000 or type(value) is float:
+        return _group_digits(value)
+    return str(int(value))
+
+def _fmt_bool(value: bool, key: str) -> str:
+    """Форматирование булева значения"""
+    return f"{Fore.GREEN}✓ Да{Style.RESET_ALL}" if value else f"{Fore.RED}✗ Нет{Style.RESET_ALL}"
+
+def _fmt_default(value: Any, key: str) -> str:
+    """Форматирование строк и прочих значений"""
+    str_value = str(value)
+    # Пропускаем очень длинные URL и технические строки
+    if len(str_value) > 80:
+        return str_value[:77] + "..."
+    return str_value
+
+# Форматтер по точному типу значения: bool - подкласс int, поэтому через
+# isinstance до него дело не доходило; type(value) различает их
+_FORMATTERS = {
+    dict: _fmt_dict,
+    list: _fmt_list,
+    bool: _fmt_bool,
+    int: _fmt_num,
+    float: _fmt_num,
+    str: _fmt_default,
+}
 
 def format_value(value: Any, key: str = "") -> str:
     """Форматирование значения для вывода"""
-    if isinstance(value, dict):
-        # Для словарей показываем компактный формат
-        items = []
-        for k, v in value.items():
-            if isinstance(v, (int, float, str, bool)):
-                items.append(f"{k}: {v}")
-            else:
-                items.append(f"{k}: ...")
-        result = ", ".join(items[:3])
-        if len(items) > 3:
-            result += f" ... (+{len(items) - 3} еще)"
-        return result
-    elif isinstance(value, list):
-        if len(value) == 0:
-            return "пусто"
-        elif len(value) <= 3:
-            return ", ".join(str(v) for v in value)
-        else:
-            return f"{len(value)} элементов: {', '.join(str(v) for v in value[:2])} ..."
-    elif isinstance(value, (int, float)):
-        # Для числовых значений добавляем форматирование
-        key_lower = key.lower()
-        
-        # Форматирование времени
-        if 'hours' in key_lower or 'minutes' in key_lower or 'remaining' in key_lower:
-            if isinstance(value, (int, float)) and value >= 0:
-                if 'minutes' in key_lower and value >= 60:
-                    hours = int(value // 60)
-                    minutes = int(value % 60)
-                    if hours > 0 and minutes > 0:
-                        return f"{hours} ч. {minutes} мин."
-                    elif hours > 0:
-                        return f"{hours} ч."
-                    else:
-                        return f"{int(value)} мин."
-                elif 'hours' in key_lower or 'remaining' in key_lower:
-                    hours = int(value)
-                    if hours >= 24:
-                        days = hours // 24
-                        remaining_hours = hours % 24
-                        if days > 0 and remaining_hours > 0:
-                            return f"{days} дн. {remaining_hours} ч."
-                        elif days > 0:
-                            return f"{days} дн."
-                    return f"{hours} ч."
-        
-        # Форматирование чисел
-        if value >= 1000:
-            return f"{value:,.0f}".replace(",", " ")
-        return f"{value:,.0f}".replace(",", " ") if isinstance(value, float) else str(int(value))
-    elif isinstance(value, bool):
-        return f"{Fore.GREEN}✓ Да{Style.RESET_ALL}" if value else f"{Fore.RED}✗ Нет{Style.RESET_ALL}"
-    else:
-        str_value = str(value)
-        # Пропускаем очень длинные URL и технические строки
-        if len(str_value) > 80:
-            return str_value[:77] + "..."
-        return str_value
+    return _FORMATTERS.get(type(value), _fmt_default)(value, key)
 
+@lru_cache(maxsize=1024)
 def get_display_name(key: str) -> str:
     """Получить понятное название для ключа"""
-    key_lower = key.lower()
-    
-    # Убираем префиксы источников
-    clean_key = key.replace('storage.', '').replace('sqlite.', '')
-    parts = clean_key.split('/')
-    last_part = parts[-1]
-    
-    # Маппинг ключей на понятные названия
-    name_mapping = {
-        'remaining': 'Осталось',
-        'used': 'Использовано',
-        'total': 'Всего',
-        'limit': 'Лимит',
-        'quota': 'Квота',
-        'subscription': 'Подписка',
-        'tier': 'Тариф',
-        'plan': 'План',
-        'tokens': 'Токены',
-        'requests': 'Запросы',
-        'credits': 'Кредиты',
-        'balance': 'Баланс',
-        'hours': 'Часы',
-        'minutes': 'Минуты',
-        'grace': 'Льготный период',
-        'period': 'Период',
-        'premium': 'Премиум',
-        'pro': 'Про',
-        'free': 'Бесплатно',
-        'newprivacymodehoursremainingingraceperiod': 'Льготный период (часы)',
-    }
+    parsed = parse_key(key)
+    parts = parsed.parts
+    last_part = parsed.last
     
     # Ищем точное совпадение
-    if last_part.lower() in name_mapping:
-        return name_mapping[last_part.lower()]
+    display = DISPLAY_NAMES.get(last_part.lower())
+    if display is not None:
+        return display
     
     # Ищем частичные совпадения
-    for word, display in name_mapping.items():
-        if word in key_lower:
+    for word, display in DISPLAY_NAMES.items():
+        if word in parsed.lower:
             # Если есть контекст в пути, добавляем его
             if len(parts) > 1 and parts[-2]:
                 context = parts[-2].replace('_', ' ').title()
@@ -343,70 +499,91 @@ def get_display_name(key: str) -> str:
         formatted = formatted[0].upper() + formatted[1:]
     return formatted if formatted else key
 
-def print_progress_bar(used: float, total: float, label: str = ""):
-    """Вывести прогресс-бар для использованных/оставшихся лимитов"""
+def format_progress_bar(used: float, total: float, label: str = "") -> Optional[str]:
+    """Сформировать прогресс-бар для использованных/оставшихся лимитов"""
     if total <= 0:
-        return
+        return None
     
-    percentage = (used / total) * 100
     bar_length = 30
-    filled = int(bar_length * used / total)
+    filled = int(used * bar_length // total)
+    # Процент в десятых долях (промилле), округленный до ближайшего целого
+    permille = int((used * 2000 // total + 1) // 2)
     
-    bar = "█" * filled + "░" * (bar_length - filled)
+    bar = ("█" * filled).ljust(bar_length, "░")
     
+    # Пороги сравниваем без деления: used / total >= 0.9 и >= 0.7
     color = Fore.GREEN
-    if percentage >= 90:
+    if used * 10 >= total * 9:
         color = Fore.RED
-    elif percentage >= 70:
+    elif used * 10 >= total * 7:
         color = Fore.YELLOW
     
-    print(f"  {label}")
-    print(f"  {color}{bar}{Style.RESET_ALL} {used:,.0f} / {total:,.0f} ({percentage:.1f}%)")
+    return f"  {label}\n  {color}{bar}{_RESET} {used:,.0f} / {total:,.0f} ({permille / 10:.1f}%)"
 
-def print_limits(limits: Dict[str, Any], source: str):
-    """Вывод лимитов в консоль с группировкой по категориям"""
-    if not limits:
-        print(f"{Fore.YELLOW}{EMOJI['WARNING']} Информация о лимитах не найдена в {source}{Style.RESET_ALL}")
-        return
+def print_progress_bar(used: float, total: float, label: str = ""):
+    """Вывести прогресс-бар для использованных/оставшихся лимитов"""
+    bar = format_progress_bar(used, total, label)
+    if bar is not None:
+        print(bar)
+
+def print_limits(limits: Union[Dict[str, Any], Iterable[Tuple[str, Any]]], source: str):
+    """Вывод лимитов в консоль с группировкой по категориям.
+
+    limits - словарь или последовательность пар (ключ, значение), например iter_limits().
+    """
+    items = limits.items() if isinstance(limits, dict) else limits
     
-    # Группируем лимиты по категориям
+    # За один проход группируем лимиты по категориям и строим индекс total-значений
+    # по родительскому сегменту пути ("quota/total" -> "quota"), чтобы для каждого
+    # remaining находить пару без повторного обхода всех лимитов
     categories = {}
-    for key, value in limits.items():
+    totals = {}
+    for key, value in items:
         category = get_category(key)
         if category not in categories:
             categories[category] = []
         categories[category].append((key, value))
+        
+        parsed = parse_key(key)
+        if parsed.bucket is not None and 'total' in parsed.lower and type(value) in (int, float):
+            totals.setdefault(parsed.bucket, value)
     
-    print(f"\n{Fore.CYAN}{'='*70}{Style.RESET_ALL}")
-    print(f"{Fore.CYAN}{EMOJI['LIMIT']} Лимиты из {source}{Style.RESET_ALL}")
-    print(f"{Fore.CYAN}{'='*70}{Style.RESET_ALL}\n")
+    if not categories:
+        print(f"{Fore.YELLOW}{EMOJI['WARNING']} Информация о лимитах не найдена в {source}{_RESET}")
+        return
     
-    # Выводим категории в определенном порядке
-    category_order = ["Подписка", "Оставшееся время", "Использование", "Лимиты", "Ресурсы", "Прочее"]
+    # Собираем все строки и выводим их одной записью в stdout
+    lines = ["", _BAR_EQ, f"{Fore.CYAN}{EMOJI['LIMIT']} Лимиты из {source}{_RESET}", _BAR_EQ, ""]
     
-    for category in category_order:
+    # Выводим категории в определенном порядке
+    for category in CATEGORY_ORDER:
         if category not in categories:
             continue
         
-        print(f"{Fore.MAGENTA}{'─'*70}{Style.RESET_ALL}")
-        print(f"{Fore.MAGENTA}📁 {category}{Style.RESET_ALL}")
-        print(f"{Fore.MAGENTA}{'─'*70}{Style.RESET_ALL}\n")
+        lines += [_BAR_DASH, f"{Fore.MAGENTA}📁 {category}{_RESET}", _BAR_DASH, ""]
         
         # Сортируем элементы в категории
         items = sorted(categories[category], key=lambda x: x[0])
         
         for key, value in items:
+            parsed = parse_key(key)
+            key_lower = parsed.lower
             display_name = get_display_name(key)
             formatted_value = format_value(value, key)
             
+            # Тип значения проверяем один раз (bool - подкласс int, поэтому сравниваем точный тип)
+            value_type = type(value)
+            is_bool = value_type is bool
+            is_num = value_type is int or value_type is float
+            
             # Определяем цвет в зависимости от типа значения
-            if isinstance(value, (int, float)):
-                if 'remaining' in key.lower() or 'free' in key.lower():
+            if is_num:
+                if 'remaining' in key_lower or 'free' in key_lower:
                     if value > 0:
                         color = Fore.GREEN
                     else:
                         color = Fore.RED
-                elif 'used' in key.lower() or 'usage' in key.lower():
+                elif 'used' in key_lower or 'usage' in key_lower:
                     color = Fore.YELLOW
                 else:
                     color = Fore.CYAN
@@ -417,63 +594,64 @@ def print_limits(limits: Dict[str, Any], source: str):
             key_display = display_name.ljust(40)
             
             # Для булевых значений цвет уже включен в formatted_value
-            if isinstance(value, bool):
-                print(f"  {Fore.GREEN}{key_display}{Style.RESET_ALL} {formatted_value}")
+            if is_bool:
+                lines.append(f"  {_GREEN}{key_display}{_RESET} {formatted_value}")
             else:
-                print(f"  {Fore.GREEN}{key_display}{Style.RESET_ALL} {color}{formatted_value}{Style.RESET_ALL}")
+                lines.append(f"  {_GREEN}{key_display}{_RESET} {color}{formatted_value}{_RESET}")
             
             # Если есть пара used/total или remaining/total, показываем прогресс-бар
-            if isinstance(value, (int, float)) and value > 0:
+            if is_num and value > 0:
                 # Ищем связанные значения для прогресс-бара
-                key_lower = key.lower()
-                if 'remaining' in key_lower:
+                if parsed.bucket is not None and 'remaining' in key_lower:
                     # Ищем total для этого ключа
-                    for other_key, other_value in limits.items():
-                        if 'total' in other_key.lower() and key.split('/')[-2] in other_key:
-                            if isinstance(other_value, (int, float)):
-                                used_val = other_value - value
-                                print_progress_bar(used_val, other_value, "  Использование:")
-                                break
+                    total = totals.get(parsed.bucket)
+                    if total is not None:
+                        bar = format_progress_bar(total - value, total, "  Использование:")
+                        if bar is not None:
+                            lines.append(bar)
         
-        print()
+        lines.append("")
     
     # Если есть необработанные категории
     for category, items in categories.items():
-        if category not in category_order:
-            print(f"{Fore.MAGENTA}{'─'*70}{Style.RESET_ALL}")
-            print(f"{Fore.MAGENTA}📁 {category}{Style.RESET_ALL}")
-            print(f"{Fore.MAGENTA}{'─'*70}{Style.RESET_ALL}\n")
+        if category not in CATEGORY_ORDER:
+            lines += [_BAR_DASH, f"{Fore.MAGENTA}📁 {category}{_RESET}", _BAR_DASH, ""]
             
             for key, value in sorted(items, key=lambda x: x[0]):
                 display_name = get_display_name(key)
                 formatted_value = format_value(value, key)
                 key_display = display_name.ljust(35)
-                print(f"  {Fore.GREEN}{key_display}{Style.RESET_ALL} {Fore.WHITE}{formatted_value}{Style.RESET_ALL}")
-            print()
-
-def merge_limits(storage_limits: Dict[str, Any], sqlite_limits: Dict[str, Any]) -> Dict[str, Any]:
-    """Объединить лимиты из разных источников"""
-    merged = {}
+                lines.append(f"  {_GREEN}{key_display}{_RESET} {_WHITE}{formatted_value}{_RESET}")
+            lines.append("")
     
+    sys.stdout.write("\n".join(lines) + "\n")
+
+def iter_limits(storage_limits: Dict[str, Any], sqlite_limits: Dict[str, Any]) -> Iterator[Tuple[str, Any]]:
+    """Перебрать лимиты из разных источников без построения общего словаря"""
     # Добавляем лимиты из storage.json
+    seen = set()
     for key, value in storage_limits.items():
-        merged[f"storage.{key}"] = value
+        merged_key = f"storage.{key}"
+        seen.add(merged_key)
+        yield merged_key, value
     
-    # Добавляем лимиты из SQLite (приоритет, если есть дубликаты)
+    # Добавляем лимиты из SQLite
     for key, value in sqlite_limits.items():
         # Если ключ уже есть, добавляем префикс sqlite
-        if f"storage.{key}" in merged:
-            merged[f"sqlite.{key}"] = value
+        if f"storage.{key}" in seen or key in seen:
+            yield f"sqlite.{key}", value
         else:
-            merged[key] = value
-    
-    return merged
+            yield key, value
+
+def merge_limits(storage_limits: Dict[str, Any], sqlite_limits: Dict[str, Any]) -> Dict[str, Any]:
+    """Объединить лимиты из разных источников"""
+    return dict(iter_limits(storage_limits, sqlite_limits))
 
 def main():
     """Главная функция"""
-    print(f"\n{Fore.CYAN}{'='*70}{Style.RESET_ALL}")
-    print(f"{Fore.CYAN}{EMOJI['INFO']}  Получение информации о лимитах Cursor{Style.RESET_ALL}")
-    print(f"{Fore.CYAN}{'='*70}{Style.RESET_ALL}\n")
+    print(f"\n{_BAR_EQ}")
+    print(f"{Fore.CYAN}{EMOJI['INFO']}  Получение информации о лимитах Cursor{_RESET}")
+    print(f"{_BAR_EQ}\n")
     
     # Получаем пути к файлам
     storage_path = get_cursor_storage_path()
@@ -483,15 +661,16 @@ def main():
     print(f"{Fore.WHITE}   📄 storage.json: {storage_path}{Style.RESET_ALL}")
     print(f"{Fore.WHITE}   💾 SQLite БД:    {sqlite_path}{Style.RESET_ALL}\n")
     
-    # Получаем лимиты из обоих источников
-    storage_limits = get_limits_from_storage(storage_path)
-    sqlite_limits = get_limits_from_sqlite(sqlite_path)
-    
-    # Объединяем лимиты
-    all_limits = merge_limits(storage_limits, sqlite_limits)
+    # Получаем лимиты из обоих источников параллельно: файлы независимы,
+    # а чтение файла и запросы sqlite3 отпускают GIL
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        storage_future = executor.submit(get_limits_from_storage, storage_path)
+        sqlite_future = executor.submit(get_limits_from_sqlite, sqlite_path)
+        storage_limits = storage_future.result()
+        sqlite_limits = sqlite_future.result()
     
     # Если ничего не найдено
-    if not all_limits:
+    if not storage_limits and not sqlite_limits:
         print(f"{Fore.YELLOW}{EMOJI['WARNING']}  Информация о лимитах не найдена.{Style.RESET_ALL}")
         print(f"{Fore.CYAN}ℹ️   Убедитесь, что:{Style.RESET_ALL}")
         print(f"   • Cursor установлен и использовался")
@@ -499,11 +678,11 @@ def main():
         print(f"   • Вы использовали функции, которые имеют лимиты\n")
     else:
         # Выводим объединенные лимиты
-        print_limits(all_limits, "Cursor")
+        print_limits(iter_limits(storage_limits, sqlite_limits), "Cursor")
     
-    print(f"{Fore.CYAN}{'='*70}{Style.RESET_ALL}")
-    print(f"{Fore.GREEN}{EMOJI['SUCCESS']}  Анализ завершен{Style.RESET_ALL}")
-    print(f"{Fore.CYAN}{'='*70}{Style.RESET_ALL}\n")
+    print(_BAR_EQ)
+    print(f"{Fore.GREEN}{EMOJI['SUCCESS']}  Анализ завершен{_RESET}")
+    print(f"{_BAR_EQ}\n")
 
 if __name__ == "__main__":
     try:
@@ -1,658 +1,1154 @@
-import os
-import sys
-import json
-import shutil
-import sqlite3
-import uuid
-from colorama import Fore, Style, init
-from typing import Optional
-import configparser
-import traceback
-from datetime import datetime
-
-# 初始化 colorama
-init()
-
-# 定义表情符号常量
-EMOJI = {
-    "FILE": "📄",
-    "BACKUP": "💾",
-    "SUCCESS": "✅",
-    "ERROR": "❌",
-    "INFO": "ℹ️",
-    "RESET": "🔄",
-    "WARNING": "⚠️",
-}
-
-class ConfigError(Exception):
-    """配置错误异常"""
-    pass
-
-class SimpleTranslator:
-    """Простой класс для перевода сообщений"""
-    def __init__(self):
-        self.translations = {
-            'reset.current_file_not_found': 'Текущий файл не найден',
-            'reset.current_backup_created': 'Создана резервная копия текущего файла',
-            'reset.storage_updated': 'Файл storage.json обновлен',
-            'reset.update_failed': 'Ошибка обновления: {error}',
-            'reset.sqlite_not_found': 'SQLite база данных не найдена',
-            'reset.updating_sqlite': 'Обновление SQLite базы данных',
-            'reset.updating_pair': 'Обновление пары',
-            'reset.sqlite_updated': 'SQLite база данных обновлена',
-            'reset.sqlite_update_failed': 'Ошибка обновления SQLite: {error}',
-            'reset.machine_id_backup_created': 'Создана резервная копия machineId файла',
-            'reset.backup_creation_failed': 'Не удалось создать резервную копию: {error}',
-            'reset.machine_id_updated': 'Файл machineId обновлен',
-            'reset.machine_id_update_failed': 'Ошибка обновления machineId: {error}',
-            'reset.updating_system_ids': 'Обновление системных ID',
-            'reset.system_ids_update_failed': 'Ошибка обновления системных ID: {error}',
-            'reset.windows_machine_guid_updated': 'Windows MachineGuid обновлен',
-            'reset.permission_denied': 'Доступ запрещен. Запустите от имени администратора',
-            'reset.update_windows_machine_guid_failed': 'Ошибка обновления MachineGuid: {error}',
-            'reset.windows_machine_id_updated': 'Windows MachineId обновлен',
-            'reset.sqm_client_key_not_found': 'Ключ SQMClient не найден',
-            'reset.update_windows_machine_id_failed': 'Ошибка обновления MachineId: {error}',
-            'reset.update_windows_system_ids_failed': 'Ошибка обновления системных ID Windows: {error}',
-            'reset.macos_platform_uuid_updated': 'macOS Platform UUID обновлен',
-            'reset.failed_to_execute_plutil_command': 'Не удалось выполнить команду plutil',
-            'reset.update_macos_system_ids_failed': 'Ошибка обновления системных ID macOS: {error}',
-            'reset.starting': 'Начало сброса Machine ID',
-            'reset.ids_to_reset': 'Новые ID для установки',
-            'reset.confirm': 'Подтвердите сброс Machine ID. Это действие нельзя отменить! (y/n)',
-            'reset.operation_cancelled': 'Операция отменена',
-            'reset.success': 'Сброс Machine ID завершен успешно',
-            'reset.process_error': 'Ошибка процесса: {error}',
-            'reset.title': 'Сброс Machine ID',
-            'reset.press_enter': 'Нажмите Enter для продолжения',
-            'reset.generating_new_ids': 'Генерация новых Machine ID...',
-            'reset.backing_up_current': 'Создание резервной копии текущих ID...',
-        }
-    
-    def get(self, key: str, **kwargs) -> str:
-        """Получить переведенное сообщение"""
-        msg = self.translations.get(key, key)
-        if kwargs:
-            try:
-                return msg.format(**kwargs)
-            except KeyError:
-                return msg
-        return msg
-
-def is_arch_linux() -> bool:
-    """Проверить, является ли система Arch Linux"""
-    if sys.platform != "linux":
-        return False
-    # Проверяем наличие файла /etc/arch-release (стандартный способ определения Arch Linux)
-    return os.path.exists("/etc/arch-release")
-
-def get_user_documents_path() -> str:
-    """Получить путь к папке Documents пользователя"""
-    if sys.platform == "win32":
-        # Windows
-        documents = os.path.join(os.path.expanduser("~"), "Documents")
-    elif sys.platform == "darwin":
-        # macOS
-        documents = os.path.expanduser("~/Documents")
-    else:
-        # Linux (включая Arch Linux)
-        documents = os.path.expanduser("~/Documents")
-    
-    return documents
-
-def get_cursor_machine_id_path(translator=None) -> str:
-    """Получить путь к файлу machineId Cursor"""
-    if sys.platform == "win32":
-        # Windows: %APPDATA%\Cursor\User\machineId
-        appdata = os.getenv("APPDATA")
-        if appdata:
-            return os.path.join(appdata, "Cursor", "User", "machineId")
-        else:
-            return os.path.join(os.path.expanduser("~"), "AppData", "Roaming", "Cursor", "User", "machineId")
-    elif sys.platform == "darwin":
-        # macOS: ~/Library/Application Support/Cursor/User/machineId
-        return os.path.join(os.path.expanduser("~"), "Library", "Application Support", "Cursor", "User", "machineId")
-    else:
-        # Linux: ~/.config/Cursor/User/machineId
-        return os.path.join(os.path.expanduser("~"), ".config", "Cursor", "User", "machineId")
-
-def get_config(translator=None) -> Optional[configparser.ConfigParser]:
-    """Получить конфигурацию из файла config.ini"""
-    try:
-        config_dir = os.path.join(get_user_documents_path(), ".cursor-free-vip")
-        config_file = os.path.join(config_dir, "config.ini")
-        
-        if not os.path.exists(config_file):
-            print(f"{Fore.YELLOW}⚠️  Файл конфигурации не найден: {config_file}{Style.RESET_ALL}")
-            print(f"{Fore.CYAN}ℹ️  Создание файла конфигурации с настройками по умолчанию...{Style.RESET_ALL}")
-            
-            # Создать директорию если не существует
-            os.makedirs(config_dir, exist_ok=True)
-            
-            # Создать конфигурацию по умолчанию
-            config = configparser.ConfigParser()
-            
-            # Windows пути по умолчанию
-            if sys.platform == "win32":
-                appdata = os.getenv("APPDATA", os.path.join(os.path.expanduser("~"), "AppData", "Roaming"))
-                config.add_section('WindowsPaths')
-                config.set('WindowsPaths', 'storage_path', 
-                          os.path.join(appdata, "Cursor", "User", "globalStorage", "storage.json"))
-                config.set('WindowsPaths', 'sqlite_path', 
-                          os.path.join(appdata, "Cursor", "User", "globalStorage", "state.vscdb"))
-            
-            # macOS пути по умолчанию
-            elif sys.platform == "darwin":
-                config.add_section('MacPaths')
-                config.set('MacPaths', 'storage_path', 
-                          os.path.join(os.path.expanduser("~"), "Library", "Application Support", 
-                                      "Cursor", "User", "globalStorage", "storage.json"))
-                config.set('MacPaths', 'sqlite_path', 
-                          os.path.join(os.path.expanduser("~"), "Library", "Application Support", 
-                                      "Cursor", "User", "globalStorage", "state.vscdb"))
-            
-            # Arch Linux пути по умолчанию
-            elif is_arch_linux():
-                config.add_section('ArchPaths')
-                config.set('ArchPaths', 'storage_path', 
-                          os.path.join(os.path.expanduser("~"), ".config", "Cursor", "User", 
-                                      "globalStorage", "storage.json"))
-                config.set('ArchPaths', 'sqlite_path', 
-                          os.path.join(os.path.expanduser("~"), ".config", "Cursor", "User", 
-                                      "globalStorage", "state.vscdb"))
-            
-            # Linux пути по умолчанию (для других дистрибутивов)
-            else:
-                config.add_section('LinuxPaths')
-                config.set('LinuxPaths', 'storage_path', 
-                          os.path.join(os.path.expanduser("~"), ".config", "Cursor", "User", 
-                                      "globalStorage", "storage.json"))
-                config.set('LinuxPaths', 'sqlite_path', 
-                          os.path.join(os.path.expanduser("~"), ".config", "Cursor", "User", 
-                                      "globalStorage", "state.vscdb"))
-            
-            # Сохранить конфигурацию
-            with open(config_file, 'w', encoding='utf-8') as f:
-                config.write(f)
-            
-            print(f"{Fore.GREEN}✅ Файл конфигурации создан: {config_file}{Style.RESET_ALL}")
-            return config
-        else:
-            config = configparser.ConfigParser()
-            config.read(config_file, encoding='utf-8')
-            return config
-    except Exception as e:
-        print(f"{Fore.RED}❌ Ошибка при чтении конфигурации: {e}{Style.RESET_ALL}")
-        return None
-
-class MachineIDResetter:
-    def __init__(self, translator=None, config=None):
-        self.translator = translator if translator else SimpleTranslator()
-        
-        # Получить конфигурацию
-        if config is None:
-            config = get_config(self.translator)
-        
-        if config is None:
-            raise ConfigError("Не удалось загрузить конфигурацию")
-        
-        # 根据操作系统获取路径
-        if sys.platform == "win32":  # Windows
-            appdata = os.getenv("APPDATA")
-            if appdata is None:
-                raise EnvironmentError("APPDATA Environment Variable Not Set")
-            
-            if not config.has_section('WindowsPaths'):
-                raise ConfigError("WindowsPaths section not found in config")
-                
-            self.db_path = config.get('WindowsPaths', 'storage_path')
-            self.sqlite_path = config.get('WindowsPaths', 'sqlite_path')
-            
-        elif sys.platform == "darwin":  # macOS
-            if not config.has_section('MacPaths'):
-                raise ConfigError("MacPaths section not found in config")
-                
-            self.db_path = config.get('MacPaths', 'storage_path')
-            self.sqlite_path = config.get('MacPaths', 'sqlite_path')
-            
-        elif is_arch_linux():  # Arch Linux
-            if not config.has_section('ArchPaths'):
-                raise ConfigError("ArchPaths section not found in config")
-                
-            self.db_path = config.get('ArchPaths', 'storage_path')
-            self.sqlite_path = config.get('ArchPaths', 'sqlite_path')
-            
-        elif sys.platform == "linux":  # Linux (другие дистрибутивы)
-            if not config.has_section('LinuxPaths'):
-                raise ConfigError("LinuxPaths section not found in config")
-                
-            self.db_path = config.get('LinuxPaths', 'storage_path')
-            self.sqlite_path = config.get('LinuxPaths', 'sqlite_path')
-            
-        else:
-            raise NotImplementedError(f"Not Supported OS: {sys.platform}")
-    
-    def generate_new_ids(self):
-        """Генерация новых Machine ID"""
-        print(f"{Fore.CYAN}{EMOJI['INFO']} {self.translator.get('reset.generating_new_ids')}{Style.RESET_ALL}")
-        
-        # Генерируем новые UUID для всех типов ID
-        new_ids = {
-            "telemetry.devDeviceId": str(uuid.uuid4()),
-            "telemetry.macMachineId": str(uuid.uuid4()),
-            "telemetry.machineId": str(uuid.uuid4()),
-            "telemetry.sqmId": str(uuid.uuid4()),
-            "storage.serviceMachineId": str(uuid.uuid4())
-        }
-        
-        return new_ids
-    
-    def backup_current_ids(self):
-        """Создание резервной копии текущих ID"""
-        print(f"{Fore.CYAN}{EMOJI['INFO']} {self.translator.get('reset.backing_up_current')}{Style.RESET_ALL}")
-        
-        try:
-            current_ids = {}
-            
-            # Читаем текущие ID из storage.json
-            if os.path.exists(self.db_path):
-                try:
-                    with open(self.db_path, "r", encoding="utf-8") as f:
-                        storage_data = json.load(f)
-                        current_ids.update({
-                            "telemetry.devDeviceId": storage_data.get("telemetry.devDeviceId", ""),
-                            "telemetry.macMachineId": storage_data.get("telemetry.macMachineId", ""),
-                            "telemetry.machineId": storage_data.get("telemetry.machineId", ""),
-                            "telemetry.sqmId": storage_data.get("telemetry.sqmId", ""),
-                            "storage.serviceMachineId": storage_data.get("storage.serviceMachineId", "")
-                        })
-                except Exception as e:
-                    print(f"{Fore.YELLOW}{EMOJI['WARNING']} Не удалось прочитать текущие ID из storage.json: {e}{Style.RESET_ALL}")
-            
-            # Читаем текущие ID из SQLite
-            if os.path.exists(self.sqlite_path):
-                try:
-                    conn = sqlite3.connect(self.sqlite_path)
-                    cursor = conn.cursor()
-                    cursor.execute("""
-                        CREATE TABLE IF NOT EXISTS ItemTable (
-                            key TEXT PRIMARY KEY,
-                            value TEXT
-                        )
-                    """)
-                    
-                    keys = ["telemetry.devDeviceId", "telemetry.macMachineId", 
-                           "telemetry.machineId", "telemetry.sqmId", "storage.serviceMachineId"]
-                    for key in keys:
-                        cursor.execute("SELECT value FROM ItemTable WHERE key = ?", (key,))
-                        result = cursor.fetchone()
-                        if result and not current_ids.get(key):
-                            current_ids[key] = result[0]
-                    
-                    conn.close()
-                except Exception as e:
-                    print(f"{Fore.YELLOW}{EMOJI['WARNING']} Не удалось прочитать текущие ID из SQLite: {e}{Style.RESET_ALL}")
-            
-            # Сохраняем резервную копию
-            if current_ids:
-                backup_dir = os.path.dirname(self.db_path)
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                backup_file = os.path.join(backup_dir, f"storage.json.bak.{timestamp}")
-                
-                with open(backup_file, "w", encoding="utf-8") as f:
-                    json.dump(current_ids, f, indent=4)
-                
-                print(f"{Fore.GREEN}{EMOJI['BACKUP']} Резервная копия сохранена: {backup_file}{Style.RESET_ALL}")
-                return True
-            else:
-                print(f"{Fore.YELLOW}{EMOJI['WARNING']} Не найдено текущих ID для резервного копирования{Style.RESET_ALL}")
-                return False
-        except Exception as e:
-            print(f"{Fore.RED}{EMOJI['ERROR']} Ошибка при создании резервной копии: {e}{Style.RESET_ALL}")
-            return False
-    
-    def update_current_file(self, ids):
-        """更新当前的storage.json文件"""
-        try:
-            if not os.path.exists(self.db_path):
-                print(f"{Fore.RED}{EMOJI['ERROR']} {self.translator.get('reset.current_file_not_found')}: {self.db_path}{Style.RESET_ALL}")
-                return False
-            
-            # 读取当前文件
-            with open(self.db_path, "r", encoding="utf-8") as f:
-                current_data = json.load(f)
-            
-            # 创建当前文件的备份
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_path = f"{self.db_path}.restore_bak.{timestamp}"
-            shutil.copy2(self.db_path, backup_path)
-            print(f"{Fore.GREEN}{EMOJI['BACKUP']} {self.translator.get('reset.current_backup_created')}: {backup_path}{Style.RESET_ALL}")
-            
-            # 更新ID
-            current_data.update(ids)
-            
-            # 保存更新后的文件
-            with open(self.db_path, "w", encoding="utf-8") as f:
-                json.dump(current_data, f, indent=4)
-            
-            print(f"{Fore.GREEN}{EMOJI['SUCCESS']} {self.translator.get('reset.storage_updated')}{Style.RESET_ALL}")
-            return True
-        except Exception as e:
-            print(f"{Fore.RED}{EMOJI['ERROR']} {self.translator.get('reset.update_failed', error=str(e))}{Style.RESET_ALL}")
-            return False
-    
-    def update_sqlite_db(self, ids):
-        """更新SQLite数据库中的ID"""
-        try:
-            if not os.path.exists(self.sqlite_path):
-                print(f"{Fore.RED}{EMOJI['ERROR']} {self.translator.get('reset.sqlite_not_found')}: {self.sqlite_path}{Style.RESET_ALL}")
-                return False
-            
-            print(f"{Fore.CYAN}{EMOJI['INFO']} {self.translator.get('reset.updating_sqlite')}...{Style.RESET_ALL}")
-            
-            conn = sqlite3.connect(self.sqlite_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS ItemTable (
-                    key TEXT PRIMARY KEY,
-                    value TEXT
-                )
-            """)
-            
-            for key, value in ids.items():
-                cursor.execute("""
-                    INSERT OR REPLACE INTO ItemTable (key, value) 
-                    VALUES (?, ?)
-                """, (key, value))
-                print(f"{EMOJI['INFO']} {Fore.CYAN} {self.translator.get('reset.updating_pair')}: {key}{Style.RESET_ALL}")
-            
-            conn.commit()
-            conn.close()
-            
-            print(f"{Fore.GREEN}{EMOJI['SUCCESS']} {self.translator.get('reset.sqlite_updated')}{Style.RESET_ALL}")
-            return True
-        except Exception as e:
-            print(f"{Fore.RED}{EMOJI['ERROR']} {self.translator.get('reset.sqlite_update_failed', error=str(e))}{Style.RESET_ALL}")
-            return False
-    
-    def update_machine_id_file(self, dev_device_id):
-        """更新machineId文件"""
-        try:
-            machine_id_path = get_cursor_machine_id_path(self.translator)
-            
-            # 创建目录（如果不存在）
-            os.makedirs(os.path.dirname(machine_id_path), exist_ok=True)
-            
-            # 备份当前文件（如果存在）
-            if os.path.exists(machine_id_path):
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                backup_path = f"{machine_id_path}.restore_bak.{timestamp}"
-                try:
-                    shutil.copy2(machine_id_path, backup_path)
-                    print(f"{Fore.GREEN}{EMOJI['INFO']} {self.translator.get('reset.machine_id_backup_created')}: {backup_path}{Style.RESET_ALL}")
-                except Exception as e:
-                    print(f"{Fore.YELLOW}{EMOJI['INFO']} {self.translator.get('reset.backup_creation_failed', error=str(e))}{Style.RESET_ALL}")
-            
-            # 写入新的ID
-            with open(machine_id_path, "w", encoding="utf-8") as f:
-                f.write(dev_device_id)
-            
-            print(f"{Fore.GREEN}{EMOJI['SUCCESS']} {self.translator.get('reset.machine_id_updated')}{Style.RESET_ALL}")
-            return True
-        except Exception as e:
-            print(f"{Fore.RED}{EMOJI['ERROR']} {self.translator.get('reset.machine_id_update_failed', error=str(e))}{Style.RESET_ALL}")
-            return False
-    
-    def update_system_ids(self, ids):
-        """更新系统级ID（特定于操作系统）"""
-        try:
-            print(f"{Fore.CYAN}{EMOJI['INFO']} {self.translator.get('reset.updating_system_ids')}...{Style.RESET_ALL}")
-            
-            if sys.platform.startswith("win"):
-                self._update_windows_system_ids(ids)
-            elif sys.platform == "darwin":
-                self._update_macos_system_ids(ids)
-            
-            return True
-        except Exception as e:
-            print(f"{Fore.RED}{EMOJI['ERROR']} {self.translator.get('reset.system_ids_update_failed', error=str(e))}{Style.RESET_ALL}")
-            return False
-    
-    def _update_windows_system_ids(self, ids):
-        """更新Windows系统ID"""
-        try:
-            import winreg
-            
-            # 更新MachineGuid
-            guid = ids.get("telemetry.devDeviceId", "")
-            if guid:
-                try:
-                    key = winreg.OpenKey(
-                        winreg.HKEY_LOCAL_MACHINE,
-                        "SOFTWARE\\Microsoft\\Cryptography",
-                        0,
-                        winreg.KEY_WRITE | winreg.KEY_WOW64_64KEY
-                    )
-                    winreg.SetValueEx(key, "MachineGuid", 0, winreg.REG_SZ, guid)
-                    winreg.CloseKey(key)
-                    print(f"{Fore.GREEN}{EMOJI['SUCCESS']} {self.translator.get('reset.windows_machine_guid_updated')}{Style.RESET_ALL}")
-                except PermissionError:
-                    print(f"{Fore.RED}{EMOJI['ERROR']} {self.translator.get('reset.permission_denied')}{Style.RESET_ALL}")
-                except Exception as e:
-                    print(f"{Fore.RED}{EMOJI['ERROR']} {self.translator.get('reset.update_windows_machine_guid_failed', error=str(e))}{Style.RESET_ALL}")
-            
-            # 更新SQMClient MachineId
-            sqm_id = ids.get("telemetry.sqmId", "")
-            if sqm_id:
-                try:
-                    key = winreg.OpenKey(
-                        winreg.HKEY_LOCAL_MACHINE,
-                        r"SOFTWARE\Microsoft\SQMClient",
-                        0,
-                        winreg.KEY_WRITE | winreg.KEY_WOW64_64KEY
-                    )
-                    winreg.SetValueEx(key, "MachineId", 0, winreg.REG_SZ, sqm_id)
-                    winreg.CloseKey(key)
-                    print(f"{Fore.GREEN}{EMOJI['SUCCESS']} {self.translator.get('reset.windows_machine_id_updated')}{Style.RESET_ALL}")
-                except FileNotFoundError:
-                    print(f"{Fore.YELLOW}{EMOJI['WARNING']} {self.translator.get('reset.sqm_client_key_not_found')}{Style.RESET_ALL}")
-                except PermissionError:
-                    print(f"{Fore.RED}{EMOJI['ERROR']} {self.translator.get('reset.permission_denied')}{Style.RESET_ALL}")
-                except Exception as e:
-                    print(f"{Fore.RED}{EMOJI['ERROR']} {self.translator.get('reset.update_windows_machine_id_failed', error=str(e))}{Style.RESET_ALL}")
-        except Exception as e:
-            print(f"{Fore.RED}{EMOJI['ERROR']} {self.translator.get('reset.update_windows_system_ids_failed', error=str(e))}{Style.RESET_ALL}")
-    
-    def _update_macos_system_ids(self, ids):
-        """更新macOS系统ID"""
-        try:
-            uuid_file = "/var/root/Library/Preferences/SystemConfiguration/com.apple.platform.uuid.plist"
-            if os.path.exists(uuid_file):
-                mac_id = ids.get("telemetry.macMachineId", "")
-                if mac_id:
-                    cmd = f'sudo plutil -replace "UUID" -string "{mac_id}" "{uuid_file}"'
-                    result = os.system(cmd)
-                    if result == 0:
-                        print(f"{Fore.GREEN}{EMOJI['SUCCESS']} {self.translator.get('reset.macos_platform_uuid_updated')}{Style.RESET_ALL}")
-                    else:
-                        print(f"{Fore.RED}{EMOJI['ERROR']} {self.translator.get('reset.failed_to_execute_plutil_command')}{Style.RESET_ALL}")
-        except Exception as e:
-            print(f"{Fore.RED}{EMOJI['ERROR']} {self.translator.get('reset.update_macos_system_ids_failed', error=str(e))}{Style.RESET_ALL}")
-    
-    def check_cursor_running(self):
-        """Проверка, запущен ли Cursor"""
-        try:
-            if sys.platform == "win32":
-                # Используем tasklist для проверки процессов на Windows
-                try:
-                    import subprocess
-                    result = subprocess.run(
-                        ['tasklist', '/FI', 'IMAGENAME eq Cursor.exe', '/FO', 'CSV'],
-                        capture_output=True,
-                        text=True,
-                        timeout=5
-                    )
-                    if 'Cursor.exe' in result.stdout:
-                        # Пытаемся извлечь PID из вывода
-                        lines = result.stdout.strip().split('\n')
-                        if len(lines) > 1:  # Есть заголовок и данные
-                            # Формат CSV: "Image Name","PID","Session Name",...
-                            parts = lines[1].split('","')
-                            if len(parts) > 1:
-                                try:
-                                    pid = int(parts[1].strip('"'))
-                                    return True, pid
-                                except (ValueError, IndexError):
-                                    return True, None
-                        return True, None
-                except (subprocess.TimeoutExpired, FileNotFoundError, Exception):
-                    # Если tasklist не работает, пробуем через wmic
-                    try:
-                        result = subprocess.run(
-                            ['wmic', 'process', 'where', 'name="Cursor.exe"', 'get', 'ProcessId'],
-                            capture_output=True,
-                            text=True,
-                            timeout=5
-                        )
-                        if 'ProcessId' in result.stdout and result.stdout.strip() != 'ProcessId':
-                            # Есть процессы
-                            return True, None
-                    except Exception:
-                        pass
-                return False, None
-            elif sys.platform == "darwin":
-                # Используем pgrep на macOS
-                try:
-                    import subprocess
-                    result = subprocess.run(
-                        ['pgrep', '-i', 'cursor'],
-                        capture_output=True,
-                        text=True,
-                        timeout=5
-                    )
-                    if result.returncode == 0 and result.stdout.strip():
-                        pids = result.stdout.strip().split('\n')
-                        if pids:
-                            try:
-                                return True, int(pids[0])
-                            except ValueError:
-                                return True, None
-                except (subprocess.TimeoutExpired, FileNotFoundError, Exception):
-                    pass
-                return False, None
-            else:  # Linux
-                # Используем pgrep на Linux
-                try:
-                    import subprocess
-                    result = subprocess.run(
-                        ['pgrep', '-i', 'cursor'],
-                        capture_output=True,
-                        text=True,
-                        timeout=5
-                    )
-                    if result.returncode == 0 and result.stdout.strip():
-                        pids = result.stdout.strip().split('\n')
-                        if pids:
-                            try:
-                                return True, int(pids[0])
-                            except ValueError:
-                                return True, None
-                except (subprocess.TimeoutExpired, FileNotFoundError, Exception):
-                    pass
-                return False, None
-        except Exception:
-            # Если что-то пошло не так, возвращаем None (неизвестно)
-            return None, None
-    
-    def reset_machine_ids(self):
-        """Сброс Machine ID для Cursor - генерация новых ID"""
-        try:
-            print(f"{Fore.CYAN}{EMOJI['INFO']} {self.translator.get('reset.starting')} для Cursor...{Style.RESET_ALL}")
-            
-            # Проверяем, запущен ли Cursor
-            cursor_running, pid = self.check_cursor_running()
-            if cursor_running is True:
-                print(f"{Fore.YELLOW}{EMOJI['WARNING']} Внимание: Cursor запущен (PID: {pid})!{Style.RESET_ALL}")
-                print(f"{Fore.YELLOW}⚠️  Рекомендуется закрыть Cursor перед изменением Machine ID.{Style.RESET_ALL}")
-                continue_anyway = input(f"{Fore.YELLOW}Продолжить в любом случае? (y/n): {Style.RESET_ALL}")
-                if continue_anyway.lower() != 'y':
-                    print(f"{Fore.YELLOW}{EMOJI['INFO']} {self.translator.get('reset.operation_cancelled')}{Style.RESET_ALL}")
-                    return False
-            
-            # Проверяем существование файлов Cursor
-            machine_id_path = get_cursor_machine_id_path(self.translator)
-            if not os.path.exists(self.db_path) and not os.path.exists(self.sqlite_path) and not os.path.exists(machine_id_path):
-                print(f"{Fore.RED}{EMOJI['ERROR']} Файлы Cursor не найдены. Убедитесь, что Cursor установлен.{Style.RESET_ALL}")
-                print(f"{Fore.CYAN}Ожидаемые пути:{Style.RESET_ALL}")
-                print(f"  - storage.json: {self.db_path}")
-                print(f"  - state.vscdb: {self.sqlite_path}")
-                print(f"  - machineId: {machine_id_path}")
-                return False
-            
-            # Создаем резервную копию текущих ID
-            self.backup_current_ids()
-            
-            # Генерируем новые ID
-            new_ids = self.generate_new_ids()
-            
-            # Показываем новые ID
-            print(f"\n{Fore.CYAN}{self.translator.get('reset.ids_to_reset')} для Cursor:{Style.RESET_ALL}")
-            for key, value in new_ids.items():
-                print(f"{EMOJI['INFO']} {key}: {Fore.GREEN}{value}{Style.RESET_ALL}")
-            
-            # Подтверждение
-            confirm = input(f"\n{EMOJI['WARNING']} {self.translator.get('reset.confirm')}: ")
-            if confirm.lower() != 'y':
-                print(f"{Fore.YELLOW}{EMOJI['INFO']} {self.translator.get('reset.operation_cancelled')}{Style.RESET_ALL}")
-                return False
-            
-            # Обновляем файлы Cursor
-            if not self.update_current_file(new_ids):
-                return False
-            
-            # Обновляем SQLite базу данных Cursor
-            self.update_sqlite_db(new_ids)
-            
-            # Обновляем machineId файл Cursor
-            self.update_machine_id_file(new_ids.get("telemetry.devDeviceId", ""))
-            
-            # Обновляем системные ID
-            self.update_system_ids(new_ids)
-            
-            print(f"{Fore.GREEN}{EMOJI['SUCCESS']} {self.translator.get('reset.success')} для Cursor!{Style.RESET_ALL}")
-            print(f"{Fore.CYAN}ℹ️  Перезапустите Cursor, чтобы изменения вступили в силу.{Style.RESET_ALL}")
-            return True
-            
-        except Exception as e:
-            print(f"{Fore.RED}{EMOJI['ERROR']} {self.translator.get('reset.process_error', error=str(e))}{Style.RESET_ALL}")
-            traceback.print_exc()
-            return False
-
-def run(translator=None):
-    """Сброс machine ID для Cursor - главная функция"""
-    if translator is None:
-        translator = SimpleTranslator()
-    
-    config = get_config(translator)
-    if not config:
-        return False
-    
-    print(f"\n{Fore.CYAN}{'='*50}{Style.RESET_ALL}")
-    print(f"{Fore.CYAN}{EMOJI['RESET']} {translator.get('reset.title')} для Cursor{Style.RESET_ALL}")
-    print(f"{Fore.CYAN}{'='*50}{Style.RESET_ALL}")
-    
-    try:
-        resetter = MachineIDResetter(translator, config)
-        resetter.reset_machine_ids()
-    except Exception as e:
-        print(f"{Fore.RED}{EMOJI['ERROR']} Ошибка: {e}{Style.RESET_ALL}")
-        traceback.print_exc()
-        return False
-    
-    print(f"\n{Fore.CYAN}{'='*50}{Style.RESET_ALL}")
-    input(f"{EMOJI['INFO']} {translator.get('reset.press_enter')}...")
-    return True
-
-if __name__ == "__main__":
-    run()
\ No newline at end of file
+import os
+import sys
+import json
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import uuid
+from collections import namedtuple
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+from typing import Optional
+import configparser
+from datetime import datetime
+
+# Вывод не в терминал (или stdout нет вовсе - pythonw): цвета не нужны, colorama не импортируем
+if sys.stdout is None or not sys.stdout.isatty():
+    init = None
+
+    class _NoColor:
+        def __getattr__(self, name):
+            return ""
+
+    Fore = Style = _NoColor()
+else:
+    # colorama нужен только для старых консолей Windows; без него пишем ANSI-коды напрямую
+    try:
+        from colorama import Fore, Style, init
+    except ImportError:
+        init = None
+
+        class Fore:
+            RED = "\033[31m"
+            GREEN = "\033[32m"
+            YELLOW = "\033[33m"
+            CYAN = "\033[36m"
+
+        class Style:
+            RESET_ALL = "\033[0m"
+
+def _enable_native_ansi() -> bool:
+    """Проверить, понимает ли консоль ANSI-коды без colorama"""
+    if sys.platform != "win32":
+        return True
+    # Windows 10 1511+: включаем ENABLE_VIRTUAL_TERMINAL_PROCESSING для stdout
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+    except Exception:
+        return False
+
+# 初始化 colorama: обёртка AnsiToWin32 перехватывает каждую запись в stdout, поэтому
+# включаем её только там, где она нужна - в старой консоли Windows
+if init is not None and not _enable_native_ansi():
+    init()
+
+# RECET_DEBUG=1: печатать traceback при ошибках сброса (--debug передаётся в run() из __main__)
+DEBUG = os.environ.get("RECET_DEBUG") == "1"
+
+# 定义表情符号常量
+EMOJI = {
+    "FILE": "📄",
+    "BACKUP": "💾",
+    "SUCCESS": "✅",
+    "ERROR": "❌",
+    "INFO": "ℹ️",
+    "RESET": "🔄",
+    "WARNING": "⚠️",
+}
+
+# Готовые цветные префиксы сообщений: собираются один раз, а не в каждом print
+_ERR_PREFIX = f"{Fore.RED}{EMOJI['ERROR']} "
+_OK_PREFIX = f"{Fore.GREEN}{EMOJI['SUCCESS']} "
+_WARN_PREFIX = f"{Fore.YELLOW}{EMOJI['WARNING']} "
+_INFO_PREFIX = f"{Fore.CYAN}{EMOJI['INFO']} "
+_BACKUP_PREFIX = f"{Fore.GREEN}{EMOJI['BACKUP']} "
+_RST = Style.RESET_ALL
+
+# Ключи идентификаторов Cursor в storage.json и ItemTable
+MACHINE_ID_KEYS = (
+    "telemetry.devDeviceId",
+    "telemetry.macMachineId",
+    "telemetry.machineId",
+    "telemetry.sqmId",
+    "storage.serviceMachineId",
+)
+
+SQL_SELECT_MACHINE_IDS = (
+    "SELECT key, value FROM ItemTable WHERE key IN ("
+    + ",".join("?" * len(MACHINE_ID_KEYS)) + ")"
+)
+
+SQL_ITEM_TABLE_EXISTS = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ItemTable'"
+
+class ConfigError(Exception):
+    """配置错误异常"""
+    pass
+
+class SimpleTranslator:
+    """Простой класс для перевода сообщений"""
+    def __init__(self):
+        self.translations = {
+            'reset.current_file_not_found': 'Текущий файл не найден',
+            'reset.current_backup_created': 'Создана резервная копия текущего файла',
+            'reset.storage_updated': 'Файл storage.json обновлен',
+            'reset.update_failed': 'Ошибка обновления: {error}',
+            'reset.sqlite_not_found': 'SQLite база данных не найдена',
+            'reset.updating_sqlite': 'Обновление SQLite базы данных',
+            'reset.updating_pair': 'Обновление пары',
+            'reset.sqlite_updated': 'SQLite база данных обновлена',
+            'reset.sqlite_update_failed': 'Ошибка обновления SQLite: {error}',
+            'reset.machine_id_backup_created': 'Создана резервная копия machineId файла',
+            'reset.backup_creation_failed': 'Не удалось создать резервную копию: {error}',
+            'reset.machine_id_updated': 'Файл machineId обновлен',
+            'reset.machine_id_unchanged': 'Файл machineId уже содержит этот ID',
+            'reset.machine_id_empty': 'Пустой machineId - файл не изменен',
+            'reset.machine_id_update_failed': 'Ошибка обновления machineId: {error}',
+            'reset.updating_system_ids': 'Обновление системных ID',
+            'reset.system_ids_update_failed': 'Ошибка обновления системных ID: {error}',
+            'reset.windows_machine_guid_updated': 'Windows MachineGuid обновлен',
+            'reset.permission_denied': 'Доступ запрещен. Запустите от имени администратора',
+            'reset.update_windows_machine_guid_failed': 'Ошибка обновления MachineGuid: {error}',
+            'reset.windows_machine_id_updated': 'Windows MachineId обновлен',
+            'reset.sqm_client_key_not_found': 'Ключ SQMClient не найден',
+            'reset.update_windows_machine_id_failed': 'Ошибка обновления MachineId: {error}',
+            'reset.update_windows_system_ids_failed': 'Ошибка обновления системных ID Windows: {error}',
+            'reset.macos_platform_uuid_updated': 'macOS Platform UUID обновлен',
+            'reset.failed_to_execute_plutil_command': 'Не удалось выполнить команду plutil',
+            'reset.update_macos_system_ids_failed': 'Ошибка обновления системных ID macOS: {error}',
+            'reset.starting': 'Начало сброса Machine ID',
+            'reset.ids_to_reset': 'Новые ID для установки',
+            'reset.confirm': 'Подтвердите сброс Machine ID. Это действие нельзя отменить! (y/n)',
+            'reset.operation_cancelled': 'Операция отменена',
+            'reset.success': 'Сброс Machine ID завершен успешно',
+            'reset.process_error': 'Ошибка процесса: {error}',
+            'reset.title': 'Сброс Machine ID',
+            'reset.press_enter': 'Нажмите Enter для продолжения',
+            'reset.generating_new_ids': 'Генерация новых Machine ID...',
+            'reset.backing_up_current': 'Создание резервной копии текущих ID...',
+        }
+
+    def get(self, key: str, **kwargs) -> str:
+        """Получить переведенное сообщение"""
+        # Читаем self.translations при каждом вызове: изменения словаря после создания учитываются
+        msg = self.translations.get(key, key)
+        # Статические строки (без '{') не форматируем
+        if not kwargs or "{" not in msg:
+            return msg
+        try:
+            return msg.format_map(kwargs)
+        except (KeyError, ValueError, IndexError):
+            # Шаблон с неизвестными или некорректными подстановками возвращаем как есть
+            return msg
+
+def is_arch_linux() -> bool:
+    """Проверить, является ли система Arch Linux"""
+    if sys.platform != "linux":
+        return False
+    # Проверяем наличие файла /etc/arch-release (стандартный способ определения Arch Linux)
+    return os.path.exists("/etc/arch-release")
+
+# Платформа и пути не меняются за время работы процесса - вычисляем один раз
+_IS_WIN = sys.platform == "win32"
+_IS_MAC = sys.platform == "darwin"
+_IS_LINUX = sys.platform == "linux"
+_IS_ARCH = is_arch_linux()
+_HOME = os.path.expanduser("~")
+_APPDATA_ENV = os.getenv("APPDATA")
+_APPDATA = _APPDATA_ENV or os.path.join(_HOME, "AppData", "Roaming")
+_DOCUMENTS_PATH = os.path.join(_HOME, "Documents")
+
+if _IS_WIN:
+    import winreg
+
+# Запись реестра Windows (HKLM): подраздел, имя значения, ключ нового ID,
+# сообщения об успехе и ошибке, сообщение об отсутствии подраздела (None - считать ошибкой)
+_RegWrite = namedtuple("_RegWrite", "subkey value_name id_key ok_msg fail_msg not_found_msg")
+
+_WIN_REG_WRITES = (
+    _RegWrite("SOFTWARE\\Microsoft\\Cryptography", "MachineGuid", "telemetry.devDeviceId",
+              'reset.windows_machine_guid_updated', 'reset.update_windows_machine_guid_failed', None),
+    _RegWrite(r"SOFTWARE\Microsoft\SQMClient", "MachineId", "telemetry.sqmId",
+              'reset.windows_machine_id_updated', 'reset.update_windows_machine_id_failed',
+              'reset.sqm_client_key_not_found'),
+)
+
+# Каталог пользователя Cursor и секция config.ini с путями для текущей ОС
+if _IS_WIN:
+    # Windows: %APPDATA%\Cursor\User
+    _CURSOR_USER_DIR = os.path.join(_APPDATA, "Cursor", "User")
+    _CONFIG_SECTION = 'WindowsPaths'
+elif _IS_MAC:
+    # macOS: ~/Library/Application Support/Cursor/User
+    _CURSOR_USER_DIR = os.path.join(_HOME, "Library", "Application Support", "Cursor", "User")
+    _CONFIG_SECTION = 'MacPaths'
+else:
+    # Linux (включая Arch Linux): ~/.config/Cursor/User
+    _CURSOR_USER_DIR = os.path.join(_HOME, ".config", "Cursor", "User")
+    _CONFIG_SECTION = 'ArchPaths' if _IS_ARCH else 'LinuxPaths'
+
+_MACHINE_ID_PATH = os.path.join(_CURSOR_USER_DIR, "machineId")
+_GLOBAL_STORAGE_DIR = os.path.join(_CURSOR_USER_DIR, "globalStorage")
+
+def get_user_documents_path() -> str:
+    """Получить путь к папке Documents пользователя"""
+    return _DOCUMENTS_PATH
+
+def get_cursor_machine_id_path(translator=None) -> str:
+    """Получить путь к файлу machineId Cursor"""
+    return _MACHINE_ID_PATH
+
+def _backup_file(src: str) -> str:
+    """Создать резервную копию файла рядом с ним и вернуть её путь"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    backup_path = f"{src}.restore_bak.{timestamp}"
+    # Жёсткая ссылка не копирует данные. Это безопасно, только если оригинал потом
+    # подменяется через os.replace, а не перезаписывается на месте; если подмена
+    # не состоялась, ссылку превращает в копию _detach_backup
+    try:
+        os.link(src, backup_path)
+    except OSError:
+        # Другая ФС или нет поддержки ссылок: copyfile сам использует sendfile/fcopyfile
+        shutil.copyfile(src, backup_path)
+    return backup_path
+
+def _detach_backup(backup_path: str, src: str):
+    """Если резервная копия всё ещё жёсткая ссылка на src (подмена не состоялась), сделать её отдельным файлом"""
+    try:
+        if not os.path.samefile(src, backup_path):
+            return
+    except FileNotFoundError:
+        return
+    directory, name = os.path.split(backup_path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        shutil.copy2(backup_path, tmp_path)
+        os.replace(tmp_path, backup_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def _stage_file(target: str, binary: bool = False):
+    """Открыть временный файл рядом с target (os.replace атомарен только в пределах одной ФС)"""
+    directory, name = os.path.split(target)
+    if binary:
+        return tempfile.NamedTemporaryFile(
+            "wb", dir=directory, prefix=f".{name}.", suffix=".tmp", delete=False
+        )
+    return tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=directory,
+        prefix=f".{name}.", suffix=".tmp", delete=False
+    )
+
+def _install_staged_file(tmp, target: str):
+    """Сбросить временный файл на диск и атомарно подменить им target"""
+    try:
+        tmp.flush()
+        os.fsync(tmp.fileno())
+        tmp.close()
+        # Права доступа берём у оригинала, а не 0600 временного файла
+        try:
+            shutil.copymode(target, tmp.name)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp.name, target)
+    except BaseException:
+        _discard_staged_file(tmp)
+        raise
+
+def _discard_staged_file(tmp):
+    """Закрыть и удалить временный файл"""
+    try:
+        tmp.close()
+    except OSError:
+        pass
+    try:
+        os.unlink(tmp.name)
+    except OSError:
+        pass
+
+@lru_cache(maxsize=4)
+def _read_config_data(path: str, mtime: float) -> tuple:
+    """Разобрать config.ini в неизменяемые пары (секция, ((ключ, значение), ...));
+    mtime входит в ключ кэша, поэтому изменённый файл читается заново"""
+    config = configparser.ConfigParser(interpolation=None)
+    with open(path, encoding='utf-8') as f:
+        config.read_file(f)
+    defaults = config.defaults()
+    data = [(config.default_section, tuple(defaults.items()))]
+    for section in config.sections():
+        # items() подмешивает DEFAULT - оставляем только собственные значения секции
+        own = tuple((key, value) for key, value in config.items(section, raw=True)
+                    if defaults.get(key) != value)
+        data.append((section, own))
+    return tuple(data)
+
+def _load_config(path: str, mtime: float) -> configparser.ConfigParser:
+    """Новый ConfigParser на каждый вызов: изменения у одного вызывающего не видны другим"""
+    config = configparser.ConfigParser(interpolation=None)
+    config.read_dict({section: dict(items) for section, items in _read_config_data(path, mtime)})
+    return config
+
+def _find_cursor_process_windows():
+    """Найти процесс Cursor.exe через CreateToolhelp32Snapshot; возвращает (найден, PID)"""
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESSENTRY32W(ctypes.Structure):
+        _fields_ = [
+            ("dwSize", wintypes.DWORD),
+            ("cntUsage", wintypes.DWORD),
+            ("th32ProcessID", wintypes.DWORD),
+            ("th32DefaultHeapID", ctypes.c_size_t),
+            ("th32ModuleID", wintypes.DWORD),
+            ("cntThreads", wintypes.DWORD),
+            ("th32ParentProcessID", wintypes.DWORD),
+            ("pcPriClassBase", wintypes.LONG),
+            ("dwFlags", wintypes.DWORD),
+            ("szExeFile", wintypes.WCHAR * 260),
+        ]
+
+    TH32CS_SNAPPROCESS = 0x00000002
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+    kernel32.CreateToolhelp32Snapshot.argtypes = (wintypes.DWORD, wintypes.DWORD)
+    kernel32.Process32FirstW.argtypes = (wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W))
+    kernel32.Process32NextW.argtypes = (wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W))
+    kernel32.CloseHandle.argtypes = (wintypes.HANDLE,)
+
+    snapshot = kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
+    if snapshot is None or snapshot == ctypes.c_void_p(-1).value:
+        raise ctypes.WinError(ctypes.get_last_error())
+    try:
+        entry = PROCESSENTRY32W()
+        entry.dwSize = ctypes.sizeof(PROCESSENTRY32W)
+        found = kernel32.Process32FirstW(snapshot, ctypes.byref(entry))
+        while found:
+            if entry.szExeFile.lower() == "cursor.exe":
+                return True, entry.th32ProcessID
+            found = kernel32.Process32NextW(snapshot, ctypes.byref(entry))
+    finally:
+        kernel32.CloseHandle(snapshot)
+    return False, None
+
+def _find_cursor_process_proc():
+    """Найти процесс Cursor по /proc/<pid>/comm (как pgrep -i cursor); возвращает (найден, PID)"""
+    pids = []
+    with os.scandir("/proc") as entries:
+        for entry in entries:
+            if not entry.name.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry.name}/comm", "rb") as f:
+                    comm = f.read()
+            except OSError:
+                # Процесс уже завершился или нет доступа
+                continue
+            if b"cursor" in comm.lower():
+                pids.append(int(entry.name))
+    if pids:
+        # pgrep выводит PID по возрастанию, берём первый так же
+        return True, min(pids)
+    return False, None
+
+def get_config(translator=None) -> Optional[configparser.ConfigParser]:
+    """Получить конфигурацию из файла config.ini"""
+    try:
+        config_dir = os.path.join(get_user_documents_path(), ".cursor-free-vip")
+        config_file = os.path.join(config_dir, "config.ini")
+        
+        # Один stat: он же даёт mtime для кэша разобранного файла
+        try:
+            mtime = os.path.getmtime(config_file)
+        except FileNotFoundError:
+            mtime = None
+        
+        if mtime is None:
+            sys.stdout.write(
+                f"{Fore.YELLOW}⚠️  Файл конфигурации не найден: {config_file}{_RST}\n"
+                f"{Fore.CYAN}ℹ️  Создание файла конфигурации с настройками по умолчанию...{_RST}\n"
+            )
+            
+            # Создать директорию если не существует
+            os.makedirs(config_dir, exist_ok=True)
+            
+            # Создать конфигурацию по умолчанию (в путях нет подстановок %(...)s)
+            config = configparser.ConfigParser(interpolation=None)
+            
+            # Пути по умолчанию для текущей ОС (WindowsPaths/MacPaths/ArchPaths/LinuxPaths)
+            config.add_section(_CONFIG_SECTION)
+            config.set(_CONFIG_SECTION, 'storage_path',
+                       os.path.join(_GLOBAL_STORAGE_DIR, "storage.json"))
+            config.set(_CONFIG_SECTION, 'sqlite_path',
+                       os.path.join(_GLOBAL_STORAGE_DIR, "state.vscdb"))
+            
+            # Сохранить конфигурацию
+            with open(config_file, 'w', encoding='utf-8') as f:
+                config.write(f)
+            
+            print(f"{Fore.GREEN}✅ Файл конфигурации создан: {config_file}{_RST}")
+            return config
+        else:
+            return _load_config(config_file, mtime)
+    except Exception as e:
+        print(f"{Fore.RED}❌ Ошибка при чтении конфигурации: {e}{_RST}")
+        return None
+
+# Ключи сообщений, которые reset_machine_ids и run используют на каждом запуске
+_FLOW_MSG_KEYS = (
+    'reset.starting',
+    'reset.ids_to_reset',
+    'reset.confirm',
+    'reset.operation_cancelled',
+    'reset.success',
+    'reset.title',
+    'reset.press_enter',
+)
+
+def _flushes_log(method):
+    """Публичный метод выводит накопленный буфер сам: вне reset_machine_ids его никто не сбросит"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._flush_log()
+    return wrapper
+
+class _ResetContext:
+    """Состояние одного сброса: транзакция SQLite и ещё не подменённые временные файлы"""
+    def __init__(self):
+        self.conn = None
+        self.cursor = None          # None - транзакция SQLite не открыта
+        self.sqlite_rows = None     # пары, записанные в ItemTable до COMMIT
+        self.storage_tmp = None     # новый storage.json
+        self.machine_id_tmp = None  # новый machineId
+        self.machine_id_failed = False  # подменить machineId при фиксации не удалось
+        self.backups = []           # (резервная копия, оригинал): жёсткие ссылки до подмены оригинала
+        self.system_ids = None      # ID для обновления реестра/plist после фиксации
+        self.aborted = False
+        self.committed = False
+
+class MachineIDResetter:
+    def __init__(self, translator=None, config=None, auto_yes=False, force=False, debug=False):
+        self.translator = translator if translator else SimpleTranslator()
+        # --yes или RECET_YES=1: все вопросы подтверждаются без input() (скрипты, CI)
+        self.auto_yes = auto_yes or os.environ.get("RECET_YES") == "1"
+        # --force: при auto_yes сбрасывать и с запущенным Cursor (иначе сброс останавливается)
+        self.force = force
+        self.debug = debug or DEBUG
+        # Статические сообщения основного сценария переводим один раз
+        self._msgs = {key: self.translator.get(key) for key in _FLOW_MSG_KEYS}
+        self._schema_checked = False
+        # Соединение с SQLite открывается один раз на весь сброс (см. _get_sqlite_conn)
+        self._db_conn = None
+        # Сообщения копятся здесь и выводятся одной записью в stdout
+        self._log_buf = []
+        
+        # Получить конфигурацию
+        if config is None:
+            config = get_config(self.translator)
+        
+        if config is None:
+            raise ConfigError("Не удалось загрузить конфигурацию")
+        
+        # 根据操作系统获取路径
+        if not (_IS_WIN or _IS_MAC or _IS_LINUX):
+            raise NotImplementedError(f"Not Supported OS: {sys.platform}")
+        
+        if _IS_WIN and _APPDATA_ENV is None:
+            raise EnvironmentError("APPDATA Environment Variable Not Set")
+        
+        if not config.has_section(_CONFIG_SECTION):
+            raise ConfigError(f"{_CONFIG_SECTION} section not found in config")
+        
+        self.db_path = config.get(_CONFIG_SECTION, 'storage_path')
+        self.sqlite_path = config.get(_CONFIG_SECTION, 'sqlite_path')
+    
+    def _log(self, line: str):
+        """Добавить строку в буфер вывода"""
+        self._log_buf.append(line)
+
+    def _flush_log(self):
+        """Вывести накопленные строки одним вызовом write"""
+        if self._log_buf:
+            sys.stdout.write("\n".join(self._log_buf) + "\n")
+            self._log_buf.clear()
+        sys.stdout.flush()
+
+    def _ensure_item_table(self, cursor):
+        """Создать ItemTable, только если её ещё нет (проверка один раз на экземпляр)"""
+        if self._schema_checked:
+            return
+        cursor.execute(SQL_ITEM_TABLE_EXISTS)
+        if cursor.fetchone() is not None:
+            self._schema_checked = True
+            return
+        # Флаг не ставим: при откате транзакции созданная таблица исчезнет
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ItemTable (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+
+    def _get_sqlite_conn(self):
+        """Вернуть общее соединение с state.vscdb, открыв его при первом обращении"""
+        if self._db_conn is None:
+            self._db_conn = self._connect_sqlite()
+        return self._db_conn
+
+    def close(self):
+        """Закрыть общее соединение с SQLite"""
+        if self._db_conn is not None:
+            self._db_conn.close()
+            self._db_conn = None
+
+    def _connect_sqlite(self):
+        """Открыть соединение с state.vscdb с настроенными PRAGMA"""
+        # Транзакциями управляем сами (BEGIN IMMEDIATE), поэтому автокоммит;
+        # busy_timeout ждёт освобождения блокировки работающим Cursor вместо SQLITE_BUSY.
+        # journal_mode и synchronous не трогаем: режим WAL сохраняется в файле базы Cursor,
+        # а synchronous=NORMAL без WAL небезопасен при сбое питания
+        conn = sqlite3.connect(self.sqlite_path, timeout=5, isolation_level=None)
+        conn.executescript("""
+            PRAGMA busy_timeout = 5000;
+            PRAGMA temp_store = MEMORY;
+        """)
+        return conn
+
+    @_flushes_log
+    def generate_new_ids(self):
+        """Генерация новых Machine ID"""
+        self._log(f"{_INFO_PREFIX}{self.translator.get('reset.generating_new_ids')}{_RST}")
+        
+        # Генерируем новые UUID для всех типов ID: одно чтение urandom на все ключи,
+        # version=4 выставляет биты версии и варианта как у uuid.uuid4()
+        raw = os.urandom(16 * len(MACHINE_ID_KEYS))
+        new_ids = {
+            key: str(uuid.UUID(bytes=raw[i * 16:(i + 1) * 16], version=4))
+            for i, key in enumerate(MACHINE_ID_KEYS)
+        }
+        
+        return new_ids
+    
+    def _read_storage_ids(self):
+        """Прочитать текущие ID из storage.json (отсутствующий файл - не ошибка)"""
+        try:
+            with open(self.db_path, "r", encoding="utf-8") as f:
+                storage_data = json.load(f)
+            return {key: storage_data.get(key, "") for key in MACHINE_ID_KEYS}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            self._log(f"{_WARN_PREFIX}Не удалось прочитать текущие ID из storage.json: {e}{_RST}")
+            return {}
+
+    def _merge_sqlite_ids(self, cursor, current_ids):
+        """Дополнить current_ids значениями из ItemTable одним запросом"""
+        cursor.execute(SQL_SELECT_MACHINE_IDS, MACHINE_ID_KEYS)
+        found = dict(cursor.fetchall())
+        for key in MACHINE_ID_KEYS:
+            if key in found and not current_ids.get(key):
+                current_ids[key] = found[key]
+
+    def _save_id_backup(self, current_ids):
+        """Сохранить текущие ID в storage.json.bak.<время>"""
+        try:
+            if current_ids:
+                backup_dir = os.path.dirname(self.db_path)
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                backup_file = os.path.join(backup_dir, f"storage.json.bak.{timestamp}")
+                
+                with open(backup_file, "w", encoding="utf-8") as f:
+                    json.dump(current_ids, f, ensure_ascii=False, separators=(",", ":"))
+                
+                self._log(f"{_BACKUP_PREFIX}Резервная копия сохранена: {backup_file}{_RST}")
+                return True
+            else:
+                self._log(f"{_WARN_PREFIX}Не найдено текущих ID для резервного копирования{_RST}")
+                return False
+        except Exception as e:
+            self._log(f"{_ERR_PREFIX}Ошибка при создании резервной копии: {e}{_RST}")
+            return False
+
+    @_flushes_log
+    def backup_current_ids(self):
+        """Создание резервной копии текущих ID"""
+        self._log(f"{_INFO_PREFIX}{self.translator.get('reset.backing_up_current')}{_RST}")
+        
+        current_ids = self._read_storage_ids()
+        
+        # Читаем текущие ID из SQLite
+        # Здесь проверка exists остаётся: sqlite3.connect создал бы пустую базу
+        if os.path.exists(self.sqlite_path):
+            try:
+                # Только чтение: таблицу не создаём
+                conn = self._get_sqlite_conn()
+                with conn:
+                    self._merge_sqlite_ids(conn.cursor(), current_ids)
+            except Exception as e:
+                self._log(f"{_WARN_PREFIX}Не удалось прочитать текущие ID из SQLite: {e}{_RST}")
+            finally:
+                # Вне reset_machine_ids общее соединение никто не закроет - не держим state.vscdb открытой
+                self.close()
+        
+        return self._save_id_backup(current_ids)
+    
+    @_flushes_log
+    def update_current_file(self, ids):
+        """更新当前的storage.json文件"""
+        with self._reset_txn(use_sqlite=False) as ctx:
+            if not self._write_storage(ctx, ids):
+                ctx.aborted = True
+        return ctx.committed
+    
+    @_flushes_log
+    def update_sqlite_db(self, ids):
+        """更新SQLite数据库中的ID"""
+        try:
+            # exists вместо EAFP: sqlite3.connect создал бы отсутствующий файл
+            if not os.path.exists(self.sqlite_path):
+                self._log(f"{_ERR_PREFIX}{self.translator.get('reset.sqlite_not_found')}: {self.sqlite_path}{_RST}")
+                return False
+            
+            self._log(f"{_INFO_PREFIX}{self.translator.get('reset.updating_sqlite')}...{_RST}")
+            
+            # Все пары пишем одной транзакцией - один fsync вместо пяти;
+            # with conn фиксирует её при выходе или откатывает при ошибке
+            conn = self._get_sqlite_conn()
+            with conn:
+                cursor = conn.cursor()
+                cursor.execute("BEGIN IMMEDIATE")
+                rows = self._write_sqlite_ids(cursor, ids)
+
+            self._log_sqlite_updated(rows)
+            return True
+        except Exception as e:
+            self._log(f"{_ERR_PREFIX}{self.translator.get('reset.sqlite_update_failed', error=str(e))}{_RST}")
+            return False
+        finally:
+            # Как и в backup_current_ids: соединение с живой базой Cursor не остаётся открытым
+            self.close()
+    
+    def _write_sqlite_ids(self, cursor, ids):
+        """Записать пары ID в ItemTable внутри уже открытой транзакции"""
+        self._ensure_item_table(cursor)
+        rows = list(ids.items())
+        cursor.executemany("""
+            INSERT OR REPLACE INTO ItemTable (key, value)
+            VALUES (?, ?)
+        """, rows)
+        return rows
+    
+    def _log_sqlite_updated(self, rows):
+        """Сообщить о записанных парах (уже после коммита, чтобы не держать блокировку базы)"""
+        for key, _ in rows:
+            self._log(f"{EMOJI['INFO']} {Fore.CYAN} {self.translator.get('reset.updating_pair')}: {key}{_RST}")
+        self._log(f"{_OK_PREFIX}{self.translator.get('reset.sqlite_updated')}{_RST}")
+    
+    @_flushes_log
+    def update_machine_id_file(self, dev_device_id):
+        """更新machineId文件"""
+        with self._reset_txn(use_sqlite=False) as ctx:
+            if not self._write_machine_id(ctx, dev_device_id):
+                ctx.aborted = True
+        return ctx.committed and not ctx.machine_id_failed
+    
+    @contextmanager
+    def _reset_txn(self, use_sqlite=True):
+        """Единица сброса: транзакция SQLite и временные файлы, фиксируемые вместе при выходе"""
+        ctx = _ResetContext()
+        # exists вместо EAFP: sqlite3.connect создал бы отсутствующий файл
+        if use_sqlite and os.path.exists(self.sqlite_path):
+            try:
+                ctx.conn = self._get_sqlite_conn()
+                cursor = ctx.conn.cursor()
+                cursor.execute("BEGIN IMMEDIATE")
+                ctx.cursor = cursor
+            except Exception as e:
+                self._log(f"{_ERR_PREFIX}{self.translator.get('reset.sqlite_update_failed', error=str(e))}{_RST}")
+        try:
+            yield ctx
+        except BaseException:
+            self._discard_txn(ctx)
+            raise
+        if ctx.aborted:
+            self._discard_txn(ctx)
+        else:
+            self._commit_txn(ctx)
+    
+    def _discard_txn(self, ctx):
+        """Откатить SQLite и удалить подготовленные временные файлы"""
+        if ctx.conn is not None and ctx.conn.in_transaction:
+            ctx.conn.rollback()
+        for tmp in (ctx.storage_tmp, ctx.machine_id_tmp):
+            if tmp is not None:
+                _discard_staged_file(tmp)
+        ctx.storage_tmp = ctx.machine_id_tmp = None
+        self._detach_backups(ctx)
+    
+    def _detach_backups(self, ctx):
+        """Отвязать резервные копии от оригиналов, которые так и не были подменены"""
+        for backup_path, src in ctx.backups:
+            try:
+                _detach_backup(backup_path, src)
+            except Exception as e:
+                self._log(f"{Fore.YELLOW}{EMOJI['INFO']} {self.translator.get('reset.backup_creation_failed', error=str(e))}{_RST}")
+        ctx.backups.clear()
+    
+    def _commit_txn(self, ctx):
+        """Зафиксировать сброс: storage.json, затем SQLite, затем machineId и системные ID"""
+        # storage.json обязателен: если подменить его не удалось, остальное не применяем
+        if ctx.storage_tmp is not None:
+            try:
+                _install_staged_file(ctx.storage_tmp, self.db_path)
+                ctx.storage_tmp = None
+            except Exception as e:
+                self._log(f"{_ERR_PREFIX}{self.translator.get('reset.update_failed', error=str(e))}{_RST}")
+                self._discard_txn(ctx)
+                return
+            self._log(f"{_OK_PREFIX}{self.translator.get('reset.storage_updated')}{_RST}")
+        
+        if ctx.sqlite_rows is not None:
+            try:
+                ctx.cursor.execute("COMMIT")
+                self._log_sqlite_updated(ctx.sqlite_rows)
+            except Exception as e:
+                self._log(f"{_ERR_PREFIX}{self.translator.get('reset.sqlite_update_failed', error=str(e))}{_RST}")
+        if ctx.conn is not None and ctx.conn.in_transaction:
+            ctx.conn.rollback()
+        
+        if ctx.machine_id_tmp is not None:
+            try:
+                _install_staged_file(ctx.machine_id_tmp, get_cursor_machine_id_path(self.translator))
+                self._log(f"{_OK_PREFIX}{self.translator.get('reset.machine_id_updated')}{_RST}")
+            except Exception as e:
+                ctx.machine_id_failed = True
+                self._log(f"{_ERR_PREFIX}{self.translator.get('reset.machine_id_update_failed', error=str(e))}{_RST}")
+            ctx.machine_id_tmp = None
+        
+        # Подмена machineId могла не состояться - тогда его копия ещё связана с оригиналом
+        self._detach_backups(ctx)
+        ctx.committed = True
+        
+        # Системные ID (реестр, plist) не откатываются, поэтому меняем их только после фиксации файлов
+        if ctx.system_ids is not None:
+            self.update_system_ids(ctx.system_ids)
+    
+    def _backup_ids(self, ctx):
+        """Сохранить текущие ID, прочитанные внутри транзакции сброса"""
+        self._log(f"{_INFO_PREFIX}{self.translator.get('reset.backing_up_current')}{_RST}")
+        current_ids = self._read_storage_ids()
+        if ctx.cursor is not None:
+            try:
+                self._merge_sqlite_ids(ctx.cursor, current_ids)
+            except Exception as e:
+                self._log(f"{_WARN_PREFIX}Не удалось прочитать текущие ID из SQLite: {e}{_RST}")
+        return self._save_id_backup(current_ids)
+    
+    def _write_storage(self, ctx, ids):
+        """Подготовить новый storage.json во временном файле"""
+        try:
+            # 读取当前文件
+            try:
+                with open(self.db_path, "r", encoding="utf-8") as f:
+                    current_data = json.load(f)
+            except FileNotFoundError:
+                self._log(f"{_ERR_PREFIX}{self.translator.get('reset.current_file_not_found')}: {self.db_path}{_RST}")
+                return False
+            
+            # 创建当前文件的备份
+            backup_path = _backup_file(self.db_path)
+            ctx.backups.append((backup_path, self.db_path))
+            self._log(f"{_BACKUP_PREFIX}{self.translator.get('reset.current_backup_created')}: {backup_path}{_RST}")
+            
+            # 更新ID
+            current_data.update(ids)
+            
+            # 保存更新后的文件: во временный файл, оригинал подменяется при фиксации
+            ctx.storage_tmp = _stage_file(self.db_path)
+            json.dump(current_data, ctx.storage_tmp, ensure_ascii=False, separators=(",", ":"))
+            return True
+        except Exception as e:
+            self._log(f"{_ERR_PREFIX}{self.translator.get('reset.update_failed', error=str(e))}{_RST}")
+            return False
+    
+    def _write_sqlite(self, ctx, ids):
+        """Записать новые ID в ItemTable внутри транзакции сброса"""
+        if ctx.cursor is None:
+            if not os.path.exists(self.sqlite_path):
+                self._log(f"{_ERR_PREFIX}{self.translator.get('reset.sqlite_not_found')}: {self.sqlite_path}{_RST}")
+            return False
+        
+        self._log(f"{_INFO_PREFIX}{self.translator.get('reset.updating_sqlite')}...{_RST}")
+        try:
+            ctx.sqlite_rows = self._write_sqlite_ids(ctx.cursor, ids)
+            return True
+        except Exception as e:
+            self._log(f"{_ERR_PREFIX}{self.translator.get('reset.sqlite_update_failed', error=str(e))}{_RST}")
+            return False
+    
+    def _write_machine_id(self, ctx, dev_device_id):
+        """Подготовить новый machineId во временном файле"""
+        # Пустой ID не пишем: иначе файл machineId был бы просто обнулён
+        if not dev_device_id:
+            self._log(f"{_WARN_PREFIX}{self.translator.get('reset.machine_id_empty')}{_RST}")
+            return False
+        try:
+            machine_id_path = get_cursor_machine_id_path(self.translator)
+            new_content = dev_device_id.encode("utf-8")
+            
+            # Текущее содержимое: заодно узнаём, существует ли файл
+            try:
+                with open(machine_id_path, "rb") as f:
+                    current_content = f.read()
+            except FileNotFoundError:
+                current_content = None
+            
+            # Тот же ID уже записан - ни резервная копия, ни запись не нужны
+            if current_content == new_content:
+                self._log(f"{_OK_PREFIX}{self.translator.get('reset.machine_id_unchanged')}{_RST}")
+                return True
+            
+            # 创建目录（如果不存在）
+            if current_content is None:
+                os.makedirs(os.path.dirname(machine_id_path), exist_ok=True)
+            
+            # 备份当前文件（如果存在）
+            if current_content is not None:
+                try:
+                    backup_path = _backup_file(machine_id_path)
+                    ctx.backups.append((backup_path, machine_id_path))
+                    self._log(f"{Fore.GREEN}{EMOJI['INFO']} {self.translator.get('reset.machine_id_backup_created')}: {backup_path}{_RST}")
+                except Exception as e:
+                    self._log(f"{Fore.YELLOW}{EMOJI['INFO']} {self.translator.get('reset.backup_creation_failed', error=str(e))}{_RST}")
+            
+            # 写入新的ID: одним write во временный файл (fsync и подмена - при фиксации);
+            # на месте через O_TRUNC писать нельзя - это изменило бы и жёсткую ссылку резервной копии
+            ctx.machine_id_tmp = _stage_file(machine_id_path, binary=True)
+            ctx.machine_id_tmp.write(new_content)
+            return True
+        except Exception as e:
+            self._log(f"{_ERR_PREFIX}{self.translator.get('reset.machine_id_update_failed', error=str(e))}{_RST}")
+            return False
+    
+    def _write_system(self, ctx, ids):
+        """Запланировать обновление системных ID после фиксации сброса"""
+        ctx.system_ids = ids
+    
+    @_flushes_log
+    def update_system_ids(self, ids):
+        """更新系统级ID（特定于操作系统）"""
+        try:
+            self._log(f"{_INFO_PREFIX}{self.translator.get('reset.updating_system_ids')}...{_RST}")
+            
+            if _IS_WIN:
+                self._update_windows_system_ids(ids)
+            elif _IS_MAC:
+                self._update_macos_system_ids(ids)
+            
+            return True
+        except Exception as e:
+            self._log(f"{_ERR_PREFIX}{self.translator.get('reset.system_ids_update_failed', error=str(e))}{_RST}")
+            return False
+    
+    def _update_windows_system_ids(self, ids):
+        """更新Windows系统ID"""
+        try:
+            # Группируем значения по подразделу реестра: один дескриптор на подраздел
+            groups = {}
+            for entry in _WIN_REG_WRITES:
+                value = ids.get(entry.id_key, "")
+                if value:
+                    groups.setdefault(entry.subkey, []).append((entry, value))
+            
+            for subkey, writes in groups.items():
+                try:
+                    with winreg.OpenKey(
+                        winreg.HKEY_LOCAL_MACHINE,
+                        subkey,
+                        0,
+                        winreg.KEY_SET_VALUE | winreg.KEY_WOW64_64KEY
+                    ) as key:
+                        for entry, value in writes:
+                            try:
+                                winreg.SetValueEx(key, entry.value_name, 0, winreg.REG_SZ, value)
+                                self._log(f"{_OK_PREFIX}{self.translator.get(entry.ok_msg)}{_RST}")
+                            except Exception as e:
+                                self._log_registry_error(entry, e)
+                except Exception as e:
+                    # Подраздел не открылся - ни одно из его значений не записано
+                    for entry, _ in writes:
+                        self._log_registry_error(entry, e)
+        except Exception as e:
+            self._log(f"{_ERR_PREFIX}{self.translator.get('reset.update_windows_system_ids_failed', error=str(e))}{_RST}")
+    
+    def _log_registry_error(self, entry, error):
+        """Сообщить об ошибке записи значения реестра из _WIN_REG_WRITES"""
+        if isinstance(error, FileNotFoundError) and entry.not_found_msg:
+            self._log(f"{_WARN_PREFIX}{self.translator.get(entry.not_found_msg)}{_RST}")
+        elif isinstance(error, PermissionError):
+            self._log(f"{_ERR_PREFIX}{self.translator.get('reset.permission_denied')}{_RST}")
+        else:
+            self._log(f"{_ERR_PREFIX}{self.translator.get(entry.fail_msg, error=str(error))}{_RST}")
+    
+    def _update_macos_system_ids(self, ids):
+        """更新macOS系统ID"""
+        try:
+            uuid_file = "/var/root/Library/Preferences/SystemConfiguration/com.apple.platform.uuid.plist"
+            if os.path.exists(uuid_file):
+                mac_id = ids.get("telemetry.macMachineId", "")
+                if mac_id:
+                    # sudo может спросить пароль - сначала выводим накопленный контекст
+                    self._flush_log()
+                    # Список аргументов без промежуточного /bin/sh и разбора кавычек
+                    result = subprocess.run(
+                        ['sudo', 'plutil', '-replace', 'UUID', '-string', mac_id, uuid_file],
+                        check=False,
+                        stderr=subprocess.PIPE
+                    )
+                    if result.returncode == 0:
+                        self._log(f"{_OK_PREFIX}{self.translator.get('reset.macos_platform_uuid_updated')}{_RST}")
+                    else:
+                        # Сообщение plutil/sudo - единственная подсказка, что именно пошло не так
+                        details = result.stderr.decode(errors="replace").strip()
+                        msg = self.translator.get('reset.failed_to_execute_plutil_command')
+                        if details:
+                            msg = f"{msg}: {details}"
+                        self._log(f"{_ERR_PREFIX}{msg}{_RST}")
+        except Exception as e:
+            self._log(f"{_ERR_PREFIX}{self.translator.get('reset.update_macos_system_ids_failed', error=str(e))}{_RST}")
+    
+    def check_cursor_running(self):
+        """Проверка, запущен ли Cursor"""
+        try:
+            if _IS_WIN:
+                # Сначала снимок процессов через Toolhelp32 - без запуска tasklist
+                try:
+                    return _find_cursor_process_windows()
+                except Exception:
+                    pass
+                # Используем tasklist для проверки процессов на Windows
+                try:
+                    result = subprocess.run(
+                        ['tasklist', '/FI', 'IMAGENAME eq Cursor.exe', '/FO', 'CSV'],
+                        capture_output=True,
+                        text=True,
+                        timeout=5
+                    )
+                    if 'Cursor.exe' in result.stdout:
+                        # Пытаемся извлечь PID из вывода
+                        lines = result.stdout.strip().split('\n')
+                        if len(lines) > 1:  # Есть заголовок и данные
+                            # Формат CSV: "Image Name","PID","Session Name",...
+                            parts = lines[1].split('","')
+                            if len(parts) > 1:
+                                try:
+                                    pid = int(parts[1].strip('"'))
+                                    return True, pid
+                                except (ValueError, IndexError):
+                                    return True, None
+                        return True, None
+                except (subprocess.TimeoutExpired, FileNotFoundError, Exception):
+                    # Если tasklist не работает, пробуем через wmic
+                    try:
+                        result = subprocess.run(
+                            ['wmic', 'process', 'where', 'name="Cursor.exe"', 'get', 'ProcessId'],
+                            capture_output=True,
+                            text=True,
+                            timeout=5
+                        )
+                        if 'ProcessId' in result.stdout and result.stdout.strip() != 'ProcessId':
+                            # Есть процессы
+                            return True, None
+                    except Exception:
+                        pass
+                return False, None
+            elif _IS_MAC:
+                # Используем pgrep на macOS
+                try:
+                    result = subprocess.run(
+                        ['pgrep', '-i', 'cursor'],
+                        capture_output=True,
+                        text=True,
+                        timeout=5
+                    )
+                    if result.returncode == 0 and result.stdout.strip():
+                        pids = result.stdout.strip().split('\n')
+                        if pids:
+                            try:
+                                return True, int(pids[0])
+                            except ValueError:
+                                return True, None
+                except (subprocess.TimeoutExpired, FileNotFoundError, Exception):
+                    pass
+                return False, None
+            else:  # Linux
+                # Читаем /proc напрямую вместо запуска pgrep
+                try:
+                    return _find_cursor_process_proc()
+                except OSError:
+                    pass
+                # Используем pgrep на Linux (если /proc недоступен)
+                try:
+                    result = subprocess.run(
+                        ['pgrep', '-i', 'cursor'],
+                        capture_output=True,
+                        text=True,
+                        timeout=5
+                    )
+                    if result.returncode == 0 and result.stdout.strip():
+                        pids = result.stdout.strip().split('\n')
+                        if pids:
+                            try:
+                                return True, int(pids[0])
+                            except ValueError:
+                                return True, None
+                except (subprocess.TimeoutExpired, FileNotFoundError, Exception):
+                    pass
+                return False, None
+        except Exception:
+            # Если что-то пошло не так, возвращаем None (неизвестно)
+            return None, None
+    
+    def _confirm(self, prompt):
+        """Спросить y/n; при auto_yes ответ - y без ожидания ввода"""
+        if self.auto_yes:
+            return True
+        self._flush_log()
+        return input(prompt).lower() == 'y'
+    
+    def reset_machine_ids(self):
+        """Сброс Machine ID для Cursor - генерация новых ID"""
+        try:
+            self._log(f"{_INFO_PREFIX}{self._msgs['reset.starting']} для Cursor...{_RST}")
+            
+            # Подтверждение - до любой работы: при отказе ID даже не генерируются
+            if not self._confirm(f"\n{EMOJI['WARNING']} {self._msgs['reset.confirm']}: "):
+                self._log(f"{Fore.YELLOW}{EMOJI['INFO']} {self._msgs['reset.operation_cancelled']}{_RST}")
+                return False
+            
+            # Проверяем, запущен ли Cursor
+            cursor_running, pid = self.check_cursor_running()
+            if cursor_running is True:
+                self._log(f"{_WARN_PREFIX}Внимание: Cursor запущен (PID: {pid})!{_RST}")
+                self._log(f"{Fore.YELLOW}⚠️  Рекомендуется закрыть Cursor перед изменением Machine ID.{_RST}")
+                # Cursor перезапишет storage.json при выходе и отменит сброс, поэтому
+                # --yes на этот вопрос не отвечает: без --force сброс останавливается
+                if self.auto_yes:
+                    if not self.force:
+                        self._log(f"{_ERR_PREFIX}Закройте Cursor или добавьте --force, чтобы продолжить.{_RST}")
+                        return False
+                elif not self._confirm(f"{Fore.YELLOW}Продолжить в любом случае? (y/n): {_RST}"):
+                    self._log(f"{Fore.YELLOW}{EMOJI['INFO']} {self._msgs['reset.operation_cancelled']}{_RST}")
+                    return False
+            
+            # Проверяем существование файлов Cursor
+            machine_id_path = get_cursor_machine_id_path(self.translator)
+            # exists, а не сравнение имён из scandir: на Windows/macOS ФС нечувствительна к регистру
+            if not any(os.path.exists(p) for p in (self.db_path, self.sqlite_path, machine_id_path)):
+                self._log(f"{_ERR_PREFIX}Файлы Cursor не найдены. Убедитесь, что Cursor установлен.{_RST}")
+                self._log(f"{Fore.CYAN}Ожидаемые пути:{_RST}")
+                self._log(f"  - storage.json: {self.db_path}")
+                self._log(f"  - state.vscdb: {self.sqlite_path}")
+                self._log(f"  - machineId: {machine_id_path}")
+                return False
+            
+            # Генерируем новые ID
+            new_ids = self.generate_new_ids()
+            
+            # Показываем новые ID
+            self._log(f"\n{Fore.CYAN}{self._msgs['reset.ids_to_reset']} для Cursor:{_RST}")
+            for key, value in new_ids.items():
+                self._log(f"{EMOJI['INFO']} {key}: {Fore.GREEN}{value}{_RST}")
+            
+            # Резервная копия и все обновления - одна единица сброса: файлы подменяются,
+            # а SQLite фиксируется только при успешном выходе из блока
+            with self._reset_txn() as ctx:
+                self._backup_ids(ctx)
+                if not self._write_storage(ctx, new_ids):
+                    ctx.aborted = True
+                else:
+                    self._write_sqlite(ctx, new_ids)
+                    dev_device_id = new_ids.get("telemetry.devDeviceId", "")
+                    if dev_device_id:
+                        self._write_machine_id(ctx, dev_device_id)
+                    self._write_system(ctx, new_ids)
+            if not ctx.committed:
+                return False
+            
+            self._log(
+                f"{_OK_PREFIX}{self._msgs['reset.success']} для Cursor!{_RST}\n"
+                f"{Fore.CYAN}ℹ️  Перезапустите Cursor, чтобы изменения вступили в силу.{_RST}"
+            )
+            return True
+            
+        # Ожидаемые отказы (права, блокировки, битый JSON, закрытый stdin); ошибки в коде не глушим
+        except (OSError, sqlite3.Error, json.JSONDecodeError, EOFError) as e:
+            # Через get(): пользовательский шаблон с чужими подстановками не уронит сам обработчик
+            self._log(f"{_ERR_PREFIX}{self.translator.get('reset.process_error', error=str(e))}{_RST}")
+            self._flush_log()
+            if self.debug:
+                import traceback
+                traceback.print_exc()
+            return False
+        finally:
+            self.close()
+            self._flush_log()
+
+def run(translator=None, auto_yes=False, force=False, debug=False):
+    """Сброс machine ID для Cursor - главная функция"""
+    if translator is None:
+        translator = SimpleTranslator()
+    
+    config = get_config(translator)
+    if not config:
+        return False
+    
+    # Баннер одним блоком: одна запись в stdout вместо трёх print
+    sys.stdout.write(
+        f"\n{Fore.CYAN}{'='*50}\n"
+        f"{EMOJI['RESET']} {translator.get('reset.title')} для Cursor\n"
+        f"{'='*50}{_RST}\n"
+    )
+    sys.stdout.flush()
+    
+    try:
+        resetter = MachineIDResetter(translator, config, auto_yes=auto_yes, force=force, debug=debug)
+        resetter.reset_machine_ids()
+    except (ConfigError, configparser.Error, NotImplementedError, OSError, sqlite3.Error) as e:
+        print(f"{_ERR_PREFIX}Ошибка: {e}{_RST}")
+        if debug or DEBUG:
+            import traceback
+            traceback.print_exc()
+        return False
+    
+    print(f"\n{Fore.CYAN}{'='*50}{_RST}")
+    if not resetter.auto_yes:
+        input(f"{EMOJI['INFO']} {resetter._msgs['reset.press_enter']}...")
+    return True
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run(auto_yes="--yes" in args or "-y" in args, force="--force" in args, debug="--debug" in args)
\ No newline at end of file